@@ -0,0 +1,78 @@
+"""
+Shared pytest fixtures for the Video Conversation Agent tests
+"""
+
+import importlib
+import logging
+import os
+
+import pytest
+
+
+def pytest_configure(config):
+    """Keep pytest's cache (used by --lf/--ff) locally, but don't write it on CI."""
+    if os.getenv("CI") and getattr(config, "cache", None) is not None:
+        config.cache.set = lambda key, value: None
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logs(monkeypatch):
+    """Keep setup_logging() from creating log files and listener threads in tests."""
+    monkeypatch.setattr(
+        "src.utils.logger.setup_logging",
+        lambda *args, **kwargs: logging.getLogger().addHandler(logging.NullHandler())
+    )
+
+
+@pytest.fixture(scope="session")
+def planner():
+    """Task planner shared by all tests (no Gemini client, so it never calls the API)."""
+    return importlib.import_module("src.planner").TaskPlanner()
+
+
+@pytest.fixture(scope="session")
+def yt_handler():
+    """YouTube handler shared by all tests."""
+    return importlib.import_module("src.utils.youtube").YouTubeHandler()
+
+
+@pytest.fixture(scope="session")
+def memory():
+    """Conversation memory shared by all tests, kept entirely in memory."""
+    memory_module = importlib.import_module("src.memory")
+    memory = memory_module.ConversationMemory(storage=memory_module.DictStorage())
+    yield memory
+    memory.close()
+
+
+@pytest.fixture
+def executor():
+    """Agent executor with a placeholder key; tests swap its client for stubs."""
+    executor = importlib.import_module("src.executor").AgentExecutor("test-key")
+    yield executor
+    executor.close()
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """Agent whose data files go under tmp_path; tests swap in stub components."""
+    monkeypatch.chdir(tmp_path)
+    main = importlib.import_module("src.main")
+    monkeypatch.setattr(main, "setup_logging", lambda *args, **kwargs: None)
+    agent = main.VideoConversationAgent(api_key="test-key")
+    yield agent
+    agent.memory.close()
+
+
+@pytest.fixture(scope="session")
+def memory_dir(tmp_path_factory):
+    """Directory for tests that need conversation files on disk, created once."""
+    return tmp_path_factory.mktemp("mem", numbered=False)
+
+
+@pytest.fixture
+def disk_memory(memory_dir):
+    """Conversation memory backed by files in the shared memory_dir."""
+    memory = importlib.import_module("src.memory").ConversationMemory(str(memory_dir))
+    yield memory
+    memory.close()
@@ -2,69 +2,561 @@
 Executor Module - Executes LLM calls and tool invocations using Google Gemini API.
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-import google.generativeai as genai
+import time
+from collections import OrderedDict
+from string import Template
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Awaitable, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from src.planner import TaskPlanner
+
+T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
+# Context caching: only worth it above Gemini's minimum cacheable size
+CACHE_MIN_TOKENS = 32768
+CACHE_TTL_SECONDS = 7200
+
+# Chat sessions: exchanges replayed when (re)creating a session, the point at
+# which a session is rebuilt from that tail, and how many videos stay live.
+# The SDK resends a session's whole history on every turn, so sessions never
+# hold more than the HISTORY_TURNS exchanges a history prompt would carry.
+HISTORY_TURNS = 5
+MAX_CHAT_TURNS = HISTORY_TURNS
+MAX_CHAT_SESSIONS = 32
+
+# Gemini errors worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Context window of the model; transcripts are kept within 90% of it
+CONTEXT_TOKEN_LIMIT = 1_048_576
+
+# Default transcript budget (~200k tokens at 4 characters per token)
+MAX_TRANSCRIPT_CHARS = 800_000
+
+# Rough estimation: 1 token ≈ 4 characters (as in TaskPlanner)
+CHARS_PER_TOKEN = 4
+
+
+class VideoAnalysis(BaseModel):
+    """Response schema for analyze_video_content."""
+    main_topic: str
+    key_concepts: List[str]
+    takeaways: List[str]
+    audience: str
+    tone: str
+
+
+class IntentAnalysis(BaseModel):
+    """Response schema for understand_user_intent."""
+    focus: str
+    question: str
+    tone: str
+    creator_perspective: bool
+
+
+# Prompt templates, built once at import time
+ANALYSIS_TMPL = Template("""Analyze the following video transcript and provide:
+1. Main topic/theme
+2. Key concepts and ideas
+3. Important takeaways
+4. Target audience
+5. Speaker's tone and style
+
+Transcript:
+$transcript
+
+Provide the analysis in a structured JSON format.""")
+
+INTENT_TMPL = Template("""Given this user query about a video:
+Query: $user_query
+
+Video Summary:
+$video_context
+
+Determine:
+1. What aspect of the video is the user interested in?
+2. What is the user really asking?
+3. What tone should the response have?
+4. Should the response be from the video creator's perspective?
+
+Respond in a concise, structured format.""")
+
+# Static per-video context; kept byte-identical across turns for context caching
+CONTEXT_TMPL = Template("""You are having a conversation about a YouTube video.
+The video is titled: "$title"
+Channel: $channel
+
+Here's what the video is about:
+$transcript
+
+Respond as if YOU are the creator/subject of the video explaining your content.
+Speak naturally and conversationally.
+Be engaging and helpful.
+Reference specific parts of the video content when relevant.""")
+
+TURN_TMPL = Template("""The user is asking:
+"$user_query"
+
+Respond in $language.""")
+
+CHAT_TMPL = Template("""$user_query
+
+Respond in $language.""")
+
+HISTORY_TMPL = Template("""Previous Conversation:
+$history
+
+New User Message:
+$user_query
+
+Continue as the video creator/subject, maintaining context and continuity.
+Respond in $language.
+Keep the conversation natural and engaging.""")
+
+
+def _render_exchange(msg: Dict[str, Any]) -> str:
+    """Render one stored exchange the way history prompts show it."""
+    return f"User: {msg.get('user', '')}\nVideo (Assistant): {msg.get('assistant', '')}"
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed Gemini call may succeed if retried."""
+    from google.genai import errors
+    return isinstance(exc, errors.APIError) and exc.code in RETRYABLE_STATUS_CODES
+
+
+# Exponential backoff with jitter for transient failures; other errors and the
+# last attempt's error are raised to the caller unchanged
+_retry_transient = retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
+
 
 class AgentExecutor:
     """
     Executes planned tasks by calling Gemini API and managing tool interactions.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_transcript_chars: int = MAX_TRANSCRIPT_CHARS):
         """
         Initialize the executor with Gemini API.
         
         Args:
             api_key: Google Gemini API key
+            max_transcript_chars: Longer transcripts are cut down to this many
+                characters (keeping the start and end) before being sent
         """
+        # Imported here: the SDK pulls in a large dependency tree
+        from google import genai
+        
         self.api_key = api_key
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("gemini-1.5-pro")
+        self.model_name = "gemini-1.5-pro"
+        self.max_transcript_chars = max_transcript_chars
+        # One client for every call, so its HTTP connections are reused
+        self.client = genai.Client(api_key=api_key)
+        self.planner = TaskPlanner(self.client, self.model_name)
+        # sha256 of static context -> (cache name, local expiry time)
+        self._context_caches: Dict[str, Tuple[str, float]] = {}
+        # sha256 of static context -> in-flight cache creation
+        self._cache_tasks: Dict[str, "asyncio.Future[str]"] = {}
+        # video_id -> (chat session, exchanges it holds), least recently used first
+        self.chats: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        # Event loop for invoke(); created on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.info("AgentExecutor initialized with Gemini API")
 
-    def analyze_video_content(self, transcript: str) -> Dict[str, Any]:
+    def invoke(self, coro: Awaitable[T]) -> T:
         """
-        Use Gemini to analyze video content and extract key insights.
+        Run one of the async executor methods to completion from synchronous code.
+        
+        Every call runs on the same event loop: the shared client's async
+        connections stay bound to the loop they were opened on, so a fresh
+        loop per call (asyncio.run) would break from the second call on.
+        
+        Args:
+            coro: Awaitable returned by an executor method,
+                e.g. ``executor.analyze_video_content(transcript)``
+            
+        Returns:
+            The awaited result
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        """
+        Close the event loop used by invoke().
+        """
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    @_retry_transient
+    async def _generate(self, prompt: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Send a single prompt to Gemini without blocking the event loop.
+        
+        Rate-limit and server errors are retried with backoff.
+        
+        Args:
+            prompt: Full prompt text (or the dynamic part when config carries context)
+            config: Optional generation config, e.g. from _context_config()
+            
+        Returns:
+            The Gemini response object
+        """
+        return await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=prompt,
+            config=config
+        )
+
+    @staticmethod
+    @_retry_transient
+    async def _send_message(chat, message: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Send a message through a chat session, retrying rate-limit and server errors.
+        
+        A failed send doesn't add to the session's history, so retrying is safe.
+        
+        Args:
+            chat: Session from _get_chat()
+            message: The user's turn
+            config: Optional generation config, e.g. from _context_config()
+            
+        Returns:
+            The Gemini response object
+        """
+        return await chat.send_message(message, config=config)
+
+    @staticmethod
+    @_retry_transient
+    async def _start_stream(
+        open_stream: Callable[[], Awaitable[AsyncIterator[Any]]]
+    ) -> Tuple[AsyncIterator[Any], List[Any]]:
+        """
+        Open a response stream and wait for its first chunk, retrying
+        rate-limit and server errors.
+        
+        Nothing has reached the caller before the first chunk, so retrying up
+        to that point is safe; later errors are raised unchanged.
+        
+        Args:
+            open_stream: Starts the request, e.g. a partial of generate_content_stream
+            
+        Returns:
+            Tuple of (stream, list holding its first chunk, empty if the stream was)
+        """
+        stream = await open_stream()
+        try:
+            return stream, [await anext(stream)]
+        except StopAsyncIteration:
+            return stream, []
+
+    async def _stream_text(
+        self,
+        open_stream: Callable[[], Awaitable[AsyncIterator[Any]]]
+    ) -> AsyncIterator[str]:
+        """
+        Yield the text of a response stream, opened with retries (see _start_stream).
+        
+        Args:
+            open_stream: Starts the request, e.g. a partial of generate_content_stream
+            
+        Yields:
+            Chunks of response text
+        """
+        stream, first = await self._start_stream(open_stream)
+        for chunk in first:
+            if chunk.text:
+                yield chunk.text
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+    @staticmethod
+    def _fit(text: str, max_chars: int) -> str:
+        """
+        Cut text down to max_chars by dropping the middle.
+        
+        Args:
+            text: Text to shorten
+            max_chars: Maximum number of characters to keep
+            
+        Returns:
+            The text itself if short enough, otherwise its head and tail
+        """
+        if len(text) <= max_chars:
+            return text
+        head = max_chars // 2
+        return text[:head] + "\n...[truncated]...\n" + text[len(text) - (max_chars - head):]
+
+    async def _fit_to_context(self, transcript: str) -> str:
+        """
+        Make sure a transcript fits the transcript budget and the model's context window.
+        
+        max_transcript_chars is turned into a token budget (capped at 90% of
+        the context window) and the transcript is cut to that many estimated
+        tokens. Gemini is only asked for an exact count when the estimate
+        lands within 10% of the budget, since the estimate can be off there.
         
         Args:
             transcript: The video transcript text
             
         Returns:
-            Dictionary with analysis results
+            The transcript, shortened if it was too long
         """
-        self.logger.info("Starting video content analysis with Gemini")
+        budget = min(self.max_transcript_chars // CHARS_PER_TOKEN, int(0.9 * CONTEXT_TOKEN_LIMIT))
+        transcript = self._fit(transcript, budget * CHARS_PER_TOKEN)
         
-        prompt = f"""Analyze the following video transcript and provide:
-1. Main topic/theme
-2. Key concepts and ideas
-3. Important takeaways
-4. Target audience
-5. Speaker's tone and style
+        _, needs_precise = self.planner.estimate_tokens(transcript, budget)
+        if not needs_precise:
+            return transcript
+        
+        try:
+            for _ in range(3):
+                token_count = await self.planner.precise_token_count(transcript)
+                if token_count <= budget:
+                    break
+                transcript = self._fit(transcript, int(len(transcript) * budget / token_count))
+                self.logger.info("Transcript trimmed to %s characters to fit context", len(transcript))
+        except Exception as e:
+            # Already within the estimated budget
+            self.logger.warning("Token count failed, using estimated budget: %s", e)
+        
+        return transcript
 
-Transcript:
-{transcript}
+    @staticmethod
+    def _conversation_context(video_transcript: str, video_metadata: Dict[str, str]) -> str:
+        """
+        Build the static part of conversation prompts for a video.
+        
+        Only per-video data goes in here so the text stays byte-identical
+        across turns; per-turn data (query, language, history) is sent separately.
+        
+        Args:
+            video_transcript: The video's transcript
+            video_metadata: Video title, channel, duration, etc.
+            
+        Returns:
+            Static context text
+        """
+        return CONTEXT_TMPL.substitute(
+            title=video_metadata.get('title', 'Untitled'),
+            channel=video_metadata.get('channel', 'Unknown'),
+            transcript=video_transcript
+        )
+
+    @staticmethod
+    def _turn_prompt(user_query: str, native_language: str) -> str:
+        """Per-turn prompt for the first question about a video."""
+        return TURN_TMPL.substitute(user_query=user_query, language=native_language)
+
+    @staticmethod
+    def _chat_message(user_query: str, native_language: str) -> str:
+        """Per-turn message for a video's chat session."""
+        return CHAT_TMPL.substitute(user_query=user_query, language=native_language)
 
-Provide the analysis in a structured JSON format."""
+    @staticmethod
+    def _history_prompt(user_query: str, conversation_history: list, native_language: str) -> str:
+        """Per-turn prompt that carries the last few exchanges as text (no chat session)."""
+        return HISTORY_TMPL.substitute(
+            history="\n".join(_render_exchange(msg) for msg in conversation_history[-HISTORY_TURNS:]),
+            user_query=user_query,
+            language=native_language
+        )
+
+    async def _context_config(self, static_context: str) -> Dict[str, Any]:
+        """
+        Get a generation config that carries the static context.
+        
+        Large contexts are stored once with Gemini context caching and referenced
+        by name on later turns; small ones are sent as a system instruction.
+        
+        Args:
+            static_context: Text from _conversation_context()
+            
+        Returns:
+            Config dict for generate_content
+        """
+        if len(static_context) // CHARS_PER_TOKEN < CACHE_MIN_TOKENS:
+            return {"system_instruction": static_context}
+        
+        key = hashlib.sha256(static_context.encode("utf-8")).hexdigest()
+        cached = self._context_caches.get(key)
+        if cached and cached[1] > time.monotonic():
+            return {"cached_content": cached[0]}
+        
+        # Concurrent requests for the same context share one cache creation
+        task = self._cache_tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._create_context_cache(key, static_context))
+            self._cache_tasks[key] = task
+            task.add_done_callback(lambda _: self._cache_tasks.pop(key, None))
+        
+        try:
+            return {"cached_content": await task}
+        except Exception as e:
+            self.logger.warning("Context caching failed, sending context inline: %s", e)
+            return {"system_instruction": static_context}
+
+    async def _create_context_cache(self, key: str, static_context: str) -> str:
+        """
+        Store static context with Gemini context caching.
+        
+        Args:
+            key: sha256 of static_context
+            static_context: Text from _conversation_context()
+            
+        Returns:
+            Name of the created cache
+        """
+        cache = await self.client.aio.caches.create(
+            model=self.model_name,
+            config={
+                "system_instruction": static_context,
+                "ttl": f"{CACHE_TTL_SECONDS}s"
+            }
+        )
+        
+        # Stop using the cache a minute before Gemini expires it
+        self._context_caches[key] = (cache.name, time.monotonic() + CACHE_TTL_SECONDS - 60)
+        self.logger.info("Created context cache %s", cache.name)
+        return cache.name
+
+    async def _generate_json(self, prompt: str, schema: Type[BaseModel]) -> Dict[str, Any]:
+        """
+        Generate a response constrained to a JSON schema.
+        
+        Args:
+            prompt: Full prompt text
+            schema: Pydantic model describing the expected response
+            
+        Returns:
+            The parsed response as a plain dictionary
+        """
+        response = await self._generate(prompt, {
+            "response_mime_type": "application/json",
+            "response_schema": schema
+        })
+        parsed = response.parsed
+        if parsed is None:
+            parsed = schema.model_validate_json(response.text)
+        return parsed.model_dump()
+
+    @staticmethod
+    def history_to_contents(conversation_history: list) -> List[Dict[str, Any]]:
+        """
+        Convert stored user/assistant pairs into Gemini chat history.
+        
+        Args:
+            conversation_history: List of previous exchanges
+            
+        Returns:
+            List of content dicts with alternating user/model roles
+        """
+        contents = []
+        for msg in conversation_history:
+            contents.append({"role": "user", "parts": [{"text": msg.get("user", "")}]})
+            contents.append({"role": "model", "parts": [{"text": msg.get("assistant", "")}]})
+        return contents
+
+    def _get_chat(self, video_id: str, conversation_history: list):
+        """
+        Get the chat session for a video, creating it from stored history if needed.
+        
+        Args:
+            video_id: The video identifier
+            conversation_history: List of previous exchanges (used to seed a new session)
+            
+        Returns:
+            Async chat session
+        """
+        entry = self.chats.get(video_id)
+        if entry is not None and entry[1] < MAX_CHAT_TURNS:
+            self.chats.move_to_end(video_id)
+            return entry[0]
+        
+        seed = conversation_history[-HISTORY_TURNS:]
+        chat = self.client.aio.chats.create(
+            model=self.model_name,
+            history=self.history_to_contents(seed)
+        )
+        self.chats[video_id] = (chat, len(seed))
+        if len(self.chats) > MAX_CHAT_SESSIONS:
+            self.chats.popitem(last=False)
+        self.logger.info("Started chat session for %s", video_id)
+        return chat
+
+    def _count_turn(self, video_id: str, chat) -> None:
+        """
+        Record an exchange that a video's chat session completed.
+        
+        Turns are counted here rather than read from the session, since not
+        every SDK version exposes its history; failed sends aren't counted.
+        
+        Args:
+            video_id: The video identifier
+            chat: Session from _get_chat() that the exchange went through
+        """
+        entry = self.chats.get(video_id)
+        if entry is not None and entry[0] is chat:
+            self.chats[video_id] = (chat, entry[1] + 1)
+
+    def drop_chat(self, video_id: Optional[str] = None) -> None:
+        """
+        Forget a video's chat session (or all sessions); the next turn starts
+        a new one from stored history.
+        
+        Args:
+            video_id: Optional video ID. If None, drops every session.
+        """
+        if video_id:
+            self.chats.pop(video_id, None)
+        else:
+            self.chats.clear()
+
+    async def analyze_video_content(self, transcript: str) -> Dict[str, Any]:
+        """
+        Use Gemini to analyze video content and extract key insights.
+        
+        Args:
+            transcript: The video transcript text
+            
+        Returns:
+            Dictionary with analysis results ("content" follows VideoAnalysis)
+        """
+        self.logger.info("Starting video content analysis with Gemini")
+        
+        transcript = await self._fit_to_context(transcript)
+        prompt = ANALYSIS_TMPL.substitute(transcript=transcript)
 
         try:
-            response = self.model.generate_content(prompt)
             analysis = {
                 "status": "success",
-                "content": response.text,
+                "content": await self._generate_json(prompt, VideoAnalysis),
                 "analysis_type": "video_content"
             }
             self.logger.info("Video analysis completed successfully")
             return analysis
         except Exception as e:
-            self.logger.error(f"Error in video analysis: {str(e)}")
+            self.logger.error("Error in video analysis: %s", e)
             return {"status": "error", "error": str(e)}
 
-    def understand_user_intent(self, user_query: str, video_context: str) -> Dict[str, Any]:
+    async def understand_user_intent(self, user_query: str, video_context: str) -> Dict[str, Any]:
         """
         Analyze user query in context of video content.
         
@@ -73,38 +565,26 @@ Provide the analysis in a structured JSON format."""
             video_context: Summary of video content
             
         Returns:
-            Dictionary with intent analysis
+            Dictionary with intent analysis ("analysis" follows IntentAnalysis)
         """
         self.logger.info("Analyzing user intent")
         
-        prompt = f"""Given this user query about a video:
-Query: {user_query}
-
-Video Summary:
-{video_context}
-
-Determine:
-1. What aspect of the video is the user interested in?
-2. What is the user really asking?
-3. What tone should the response have?
-4. Should the response be from the video creator's perspective?
-
-Respond in a concise, structured format."""
+        video_context = await self._fit_to_context(video_context)
+        prompt = INTENT_TMPL.substitute(user_query=user_query, video_context=video_context)
 
         try:
-            response = self.model.generate_content(prompt)
             intent = {
                 "status": "success",
-                "analysis": response.text,
+                "analysis": await self._generate_json(prompt, IntentAnalysis),
                 "intent_type": "video_discussion"
             }
             self.logger.info("Intent analysis completed")
             return intent
         except Exception as e:
-            self.logger.error(f"Error in intent analysis: {str(e)}")
+            self.logger.error("Error in intent analysis: %s", e)
             return {"status": "error", "error": str(e)}
 
-    def generate_conversational_response(
+    async def generate_conversational_response(
         self,
         user_query: str,
         video_transcript: str,
@@ -123,26 +603,14 @@ Respond in a concise, structured format."""
         Returns:
             Dictionary with the generated response
         """
-        self.logger.info(f"Generating conversational response in {native_language}")
+        self.logger.info("Generating conversational response in %s", native_language)
         
-        prompt = f"""You are having a conversation about a YouTube video.
-The video is titled: "{video_metadata.get('title', 'Untitled')}"
-Channel: {video_metadata.get('channel', 'Unknown')}
-
-Here's what the video is about:
-{video_transcript}
-
-The user is asking:
-"{user_query}"
-
-Respond as if YOU are the creator/subject of the video explaining your content.
-Speak naturally and conversationally.
-Respond in {native_language}.
-Be engaging and helpful.
-Reference specific parts of the video content when relevant."""
-
         try:
-            response = self.model.generate_content(prompt)
+            video_transcript = await self._fit_to_context(video_transcript)
+            config = await self._context_config(
+                self._conversation_context(video_transcript, video_metadata)
+            )
+            response = await self._generate(self._turn_prompt(user_query, native_language), config)
             result = {
                 "status": "success",
                 "response": response.text,
@@ -152,15 +620,17 @@ Reference specific parts of the video content when relevant."""
             self.logger.info("Conversational response generated successfully")
             return result
         except Exception as e:
-            self.logger.error(f"Error generating response: {str(e)}")
+            self.logger.error("Error generating response: %s", e)
             return {"status": "error", "error": str(e)}
 
-    def continue_conversation(
+    async def continue_conversation(
         self,
         user_query: str,
         conversation_history: list,
         video_context: str,
-        native_language: str = "English"
+        native_language: str = "English",
+        video_metadata: Optional[Dict[str, str]] = None,
+        video_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Continue an ongoing conversation with context from previous messages.
@@ -170,34 +640,36 @@ Reference specific parts of the video content when relevant."""
             conversation_history: List of previous exchanges
             video_context: The original video content
             native_language: Language to respond in
+            video_metadata: Video title, channel, etc. (shares the context cache
+                with generate_conversational_response when given)
+            video_id: Video identifier; when given, the turn goes through that
+                video's chat session instead of re-sending the history text
             
         Returns:
             Dictionary with the continuation response
         """
         self.logger.info("Continuing conversation")
         
-        history_text = "\n".join([
-            f"User: {msg.get('user', '')}\nVideo (Assistant): {msg.get('assistant', '')}"
-            for msg in conversation_history[-5:]  # Last 5 exchanges for context
-        ])
-        
-        prompt = f"""Continue this conversation about a YouTube video.
-
-Video Content Summary:
-{video_context}
-
-Previous Conversation:
-{history_text}
-
-New User Message:
-{user_query}
-
-Continue as the video creator/subject, maintaining context and continuity.
-Respond in {native_language}.
-Keep the conversation natural and engaging."""
-
         try:
-            response = self.model.generate_content(prompt)
+            video_context = await self._fit_to_context(video_context)
+            config = await self._context_config(
+                self._conversation_context(video_context, video_metadata or {})
+            )
+            if video_id:
+                # The session keeps earlier turns, so history isn't re-rendered into the prompt
+                chat = self._get_chat(video_id, conversation_history)
+                response = await self._send_message(
+                    chat,
+                    self._chat_message(user_query, native_language),
+                    config
+                )
+                self._count_turn(video_id, chat)
+            else:
+                response = await self._generate(
+                    self._history_prompt(user_query, conversation_history, native_language),
+                    config
+                )
+            
             result = {
                 "status": "success",
                 "response": response.text,
@@ -207,5 +679,102 @@ Keep the conversation natural and engaging."""
             self.logger.info("Conversation continued successfully")
             return result
         except Exception as e:
-            self.logger.error(f"Error continuing conversation: {str(e)}")
+            self.logger.error("Error continuing conversation: %s", e)
             return {"status": "error", "error": str(e)}
+
+    async def stream_conversational_response(
+        self,
+        user_query: str,
+        video_transcript: str,
+        video_metadata: Dict[str, str],
+        native_language: str = "English"
+    ) -> AsyncIterator[str]:
+        """
+        Stream a conversational response from the video's perspective.
+        
+        Same request as generate_conversational_response(), but text is yielded
+        as Gemini produces it. Rate-limit and server errors before the first
+        chunk are retried; errors are raised rather than returned.
+        
+        Args:
+            user_query: User's question about the video
+            video_transcript: The video's transcript
+            video_metadata: Video title, channel, duration, etc.
+            native_language: Language to respond in
+            
+        Yields:
+            Chunks of response text
+        """
+        self.logger.info("Streaming conversational response in %s", native_language)
+        
+        video_transcript = await self._fit_to_context(video_transcript)
+        config = await self._context_config(
+            self._conversation_context(video_transcript, video_metadata)
+        )
+        stream = self._stream_text(functools.partial(
+            self.client.aio.models.generate_content_stream,
+            model=self.model_name,
+            contents=self._turn_prompt(user_query, native_language),
+            config=config
+        ))
+        async for text in stream:
+            yield text
+        
+        self.logger.info("Conversational response streamed successfully")
+
+    async def stream_conversation_continuation(
+        self,
+        user_query: str,
+        conversation_history: list,
+        video_context: str,
+        native_language: str = "English",
+        video_metadata: Optional[Dict[str, str]] = None,
+        video_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the next turn of an ongoing conversation.
+        
+        Same request as continue_conversation(), but text is yielded as Gemini
+        produces it. Rate-limit and server errors before the first chunk are
+        retried; errors are raised rather than returned.
+        
+        Args:
+            user_query: New user message
+            conversation_history: List of previous exchanges
+            video_context: The original video content
+            native_language: Language to respond in
+            video_metadata: Video title, channel, etc.
+            video_id: Video identifier; when given, the turn goes through that
+                video's chat session
+            
+        Yields:
+            Chunks of response text
+        """
+        self.logger.info("Streaming conversation continuation")
+        
+        video_context = await self._fit_to_context(video_context)
+        config = await self._context_config(
+            self._conversation_context(video_context, video_metadata or {})
+        )
+        chat = None
+        if video_id:
+            chat = self._get_chat(video_id, conversation_history)
+            # A failed send doesn't add to the session's history, so retrying is safe
+            stream = self._stream_text(functools.partial(
+                chat.send_message_stream,
+                self._chat_message(user_query, native_language),
+                config=config
+            ))
+        else:
+            stream = self._stream_text(functools.partial(
+                self.client.aio.models.generate_content_stream,
+                model=self.model_name,
+                contents=self._history_prompt(user_query, conversation_history, native_language),
+                config=config
+            ))
+        async for text in stream:
+            yield text
+        
+        if chat is not None:
+            self._count_turn(video_id, chat)
+        self.logger.info("Conversation continuation streamed successfully")
@@ -5,13 +5,19 @@ Orchestrates the agent workflow for YouTube video conversations.
 
 import os
 import sys
+import asyncio
+import argparse
 import logging
-from typing import Optional
-from dotenv import load_dotenv
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-# Import agent modules
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+# Import agent modules (the executor and semantic cache are imported on
+# agent creation, so the Gemini SDK and numpy aren't loaded before they're needed)
 from src.planner import TaskPlanner
-from src.executor import AgentExecutor
 from src.memory import ConversationMemory
 from src.utils.youtube import YouTubeHandler
 from src.utils.logger import setup_logging
@@ -38,14 +44,120 @@ class VideoConversationAgent:
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY environment variable not set")
         
+        from src.executor import AgentExecutor
+        from src.utils.semcache import SemanticCache
+        
         self.planner = TaskPlanner()
         self.executor = AgentExecutor(self.api_key)
         self.memory = ConversationMemory()
         self.youtube = YouTubeHandler()
+        self.semcache = SemanticCache()
         
         self.logger.info("VideoConversationAgent initialized successfully")
 
-    def run_conversation(
+    async def _load_video(
+        self,
+        video_url: str,
+        user_query: str
+    ) -> Tuple[str, Dict[str, Any], str, List[Dict[str, Any]]]:
+        """
+        Gather everything a conversation turn needs about a (validated) video.
+        
+        Args:
+            video_url: YouTube video URL
+            user_query: User's question or message about the video
+            
+        Returns:
+            Tuple of (video ID, metadata, transcript, previous messages)
+        """
+        video_id = self.youtube.extract_video_id(video_url)
+        
+        # Metadata, transcript, plan and previous conversation don't depend on
+        # each other, so fetch them concurrently
+        metadata, transcript, plan, previous_conversation = await asyncio.gather(
+            self.youtube.get_video_metadata_async(video_url),
+            self.youtube.get_video_transcript_async(video_url),
+            asyncio.to_thread(self.planner.plan_video_conversation, user_query, video_url),
+            asyncio.to_thread(self.memory.load_conversation, video_id)
+        )
+        
+        self.logger.info("Retrieved content for video: %s", video_id)
+        self.logger.info("Created plan with %s sub-tasks", len(plan['sub_tasks']))
+        
+        conversation_history = []
+        if previous_conversation:
+            conversation_history = previous_conversation.get('conversation', [])
+            self.logger.info("Loaded %s previous messages", len(conversation_history))
+        
+        return video_id, metadata, transcript, conversation_history
+
+    async def _cached_answer(
+        self,
+        video_id: str,
+        user_query: str,
+        native_language: str,
+        conversation_history: List[Dict[str, Any]]
+    ) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Look up the answer to an earlier, similar question about the video.
+        
+        Only standalone questions qualify (see SemanticCache.is_standalone);
+        follow-ups are neither looked up nor cached.
+        
+        Args:
+            video_id: The video identifier
+            user_query: User's question
+            native_language: Language the answer must be in
+            conversation_history: Previous messages
+            
+        Returns:
+            Tuple of (query embedding to cache the answer under, or None if the
+            question shouldn't be cached; cached answer or None)
+        """
+        if not self.semcache.is_standalone(user_query):
+            return None, None
+        
+        # Embedding (and loading the model on first use) is CPU-bound
+        query_embedding = await asyncio.to_thread(self.semcache.embed, user_query)
+        hit = self.semcache.lookup(video_id, query_embedding, native_language)
+        if hit is None:
+            return query_embedding, None
+        
+        self.logger.info("Semantic cache hit (score %.3f) for: %s", hit.score, hit.query)
+        if conversation_history:
+            # The chat session won't have seen this exchange; start a new one
+            # from stored history on the next turn
+            self.executor.drop_chat(video_id)
+        return query_embedding, hit.response
+
+    def _remember(
+        self,
+        video_id: str,
+        conversation_history: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        user_query: str,
+        response_text: str
+    ) -> None:
+        """
+        Store a finished exchange in conversation memory.
+        
+        Args:
+            video_id: The video identifier
+            conversation_history: Previous messages (the exchange is appended)
+            metadata: Video metadata
+            user_query: User's message
+            response_text: Agent's response
+        """
+        conversation_history.append({
+            "user": user_query,
+            "assistant": response_text,
+            "timestamp": None  # Added by memory module
+        })
+        
+        self.memory.save_conversation(video_id, conversation_history, metadata)
+        self.logger.info("Conversation saved to memory")
+
+    async def run_conversation(
         self,
         video_url: str,
         user_query: str,
@@ -62,69 +174,217 @@ class VideoConversationAgent:
         Returns:
             Agent's response about the video
         """
-        self.logger.info(f"Starting conversation for video: {video_url}")
+        self.logger.info("Starting conversation for video: %s", video_url)
         
         # Step 1: Validate URL
         if not self.youtube.validate_url(video_url):
-            self.logger.error(f"Invalid YouTube URL: {video_url}")
+            self.logger.error("Invalid YouTube URL: %s", video_url)
             return "Error: Invalid YouTube URL. Please provide a valid YouTube link."
         
-        # Step 2: Get video metadata and transcript
-        video_id = self.youtube.extract_video_id(video_url)
-        metadata = self.youtube.get_video_metadata(video_url)
-        transcript = self.youtube.get_video_transcript(video_url)
+        # Step 2: Get video content, plan and previous conversation
+        video_id, metadata, transcript, conversation_history = await self._load_video(
+            video_url, user_query
+        )
         
-        self.logger.info(f"Retrieved content for video: {video_id}")
+        # Step 3: Reuse the answer to an earlier, similar question if there is one
+        query_embedding, response_text = await self._cached_answer(
+            video_id, user_query, native_language, conversation_history
+        )
         
-        # Step 3: Plan the conversation (ReAct reasoning)
-        plan = self.planner.plan_video_conversation(user_query, video_url)
-        self.logger.info(f"Created plan with {len(plan['sub_tasks'])} sub-tasks")
+        if response_text is None:
+            # Step 4: Generate response
+            if conversation_history:
+                # Continue existing conversation
+                self.logger.info("Continuing previous conversation")
+                response = await self.executor.continue_conversation(
+                    user_query,
+                    conversation_history,
+                    transcript,
+                    native_language,
+                    video_metadata=metadata,
+                    video_id=video_id
+                )
+            else:
+                # Start new conversation
+                self.logger.info("Starting new conversation")
+                response = await self.executor.generate_conversational_response(
+                    user_query,
+                    transcript,
+                    metadata,
+                    native_language
+                )
+            
+            if response.get("status") != "success":
+                self.logger.error("Error generating response: %s", response.get('error'))
+                return f"Error: {response.get('error', 'Unknown error')}"
+            
+            response_text = response.get("response", "")
+            if query_embedding is not None:
+                self.semcache.insert(video_id, user_query, query_embedding, response_text, native_language)
         
-        # Step 4: Load previous conversation if exists
-        previous_conversation = self.memory.load_conversation(video_id)
-        conversation_history = []
+        # Step 5: Store in memory
+        self._remember(video_id, conversation_history, metadata, user_query, response_text)
         
-        if previous_conversation:
-            conversation_history = previous_conversation.get('conversation', [])
-            self.logger.info(f"Loaded {len(conversation_history)} previous messages")
+        return response_text
+
+    async def stream_conversation(
+        self,
+        video_url: str,
+        user_query: str,
+        native_language: str = "English"
+    ) -> AsyncIterator[str]:
+        """
+        Run the conversation workflow, yielding the response as it is generated.
         
-        # Step 5: Generate response
-        if conversation_history:
-            # Continue existing conversation
-            self.logger.info("Continuing previous conversation")
-            response = self.executor.continue_conversation(
-                user_query,
-                conversation_history,
-                transcript,
-                native_language
-            )
+        Args:
+            video_url: YouTube video URL
+            user_query: User's question or message about the video
+            native_language: Language to respond in
+            
+        Yields:
+            Chunks of the agent's response
+        """
+        self.logger.info("Starting streamed conversation for video: %s", video_url)
+        
+        if not self.youtube.validate_url(video_url):
+            self.logger.error("Invalid YouTube URL: %s", video_url)
+            yield "Error: Invalid YouTube URL. Please provide a valid YouTube link."
+            return
+        
+        video_id, metadata, transcript, conversation_history = await self._load_video(
+            video_url, user_query
+        )
+        
+        query_embedding, response_text = await self._cached_answer(
+            video_id, user_query, native_language, conversation_history
+        )
+        
+        if response_text is not None:
+            yield response_text
         else:
-            # Start new conversation
-            self.logger.info("Starting new conversation")
-            response = self.executor.generate_conversational_response(
-                user_query,
-                transcript,
-                metadata,
-                native_language
-            )
+            if conversation_history:
+                stream = self.executor.stream_conversation_continuation(
+                    user_query,
+                    conversation_history,
+                    transcript,
+                    native_language,
+                    video_metadata=metadata,
+                    video_id=video_id
+                )
+            else:
+                stream = self.executor.stream_conversational_response(
+                    user_query,
+                    transcript,
+                    metadata,
+                    native_language
+                )
+            
+            chunks = []
+            async for text in stream:
+                chunks.append(text)
+                yield text
+            
+            response_text = "".join(chunks)
+            if query_embedding is not None:
+                self.semcache.insert(video_id, user_query, query_embedding, response_text, native_language)
         
-        if response.get("status") != "success":
-            self.logger.error(f"Error generating response: {response.get('error')}")
-            return f"Error: {response.get('error', 'Unknown error')}"
+        self._remember(video_id, conversation_history, metadata, user_query, response_text)
+
+    async def run_conversation_batch(
+        self,
+        video_url: str,
+        queries: List[str],
+        native_language: str = "English",
+        max_concurrency: int = 8
+    ) -> List[str]:
+        """
+        Answer several independent questions about one video.
         
-        # Step 6: Store in memory
-        conversation_history.append({
-            "user": user_query,
-            "assistant": response.get("response"),
-            "timestamp": None  # Added by memory module
-        })
+        The video content and history are loaded once and the Gemini calls run
+        concurrently (at most max_concurrency at a time).
         
+        Args:
+            video_url: YouTube video URL
+            queries: User questions about the video
+            native_language: Language to respond in
+            max_concurrency: Maximum number of Gemini calls in flight
+            
+        Returns:
+            Agent's responses, in the same order as queries
+        """
+        self.logger.info("Starting batch of %s questions for video: %s", len(queries), video_url)
+        
+        if not queries:
+            return []
+        
+        if not self.youtube.validate_url(video_url):
+            self.logger.error("Invalid YouTube URL: %s", video_url)
+            return ["Error: Invalid YouTube URL. Please provide a valid YouTube link."] * len(queries)
+        
+        video_id, metadata, transcript, conversation_history = await self._load_video(
+            video_url, "\n".join(queries)
+        )
+        # One batched embedding call, off the event loop, before any Gemini request
+        query_embeddings = await asyncio.to_thread(self.semcache.embed_many, queries)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def answer(user_query: str, query_embedding: Any) -> Optional[str]:
+            hit = self.semcache.lookup(video_id, query_embedding, native_language)
+            if hit:
+                return hit.response
+            
+            async with semaphore:
+                response = await self.executor.generate_conversational_response(
+                    user_query,
+                    transcript,
+                    metadata,
+                    native_language
+                )
+            if response.get("status") != "success":
+                self.logger.error("Error generating response: %s", response.get('error'))
+                return None
+            
+            response_text = response.get("response", "")
+            self.semcache.insert(video_id, user_query, query_embedding, response_text, native_language)
+            return response_text
+        
+        responses = await asyncio.gather(
+            *(answer(q, e) for q, e in zip(queries, query_embeddings))
+        )
+        
+        # Store all answered questions with a single save
+        for user_query, response_text in zip(queries, responses):
+            if response_text is not None:
+                conversation_history.append({
+                    "user": user_query,
+                    "assistant": response_text,
+                    "timestamp": None  # Added by memory module
+                })
         self.memory.save_conversation(video_id, conversation_history, metadata)
-        self.logger.info("Conversation saved to memory")
+        self.logger.info("Batch saved to memory")
         
-        return response.get("response", "")
+        return [
+            response_text if response_text is not None else "Error: Could not generate a response"
+            for response_text in responses
+        ]
+
+    def clear_memory(self, video_id: Optional[str] = None) -> int:
+        """
+        Forget the conversation about a video (or all videos), including its
+        cached answers and chat session.
+        
+        Args:
+            video_id: Optional video ID. If None, clears all memory.
+            
+        Returns:
+            Number of conversation files deleted
+        """
+        deleted = self.memory.clear_memory(video_id)
+        self.semcache.clear(video_id)
+        self.executor.drop_chat(video_id)
+        return deleted
 
-    def interactive_mode(self):
+    async def interactive_mode(self):
         """
         Run the agent in interactive CLI mode.
         """
@@ -155,40 +415,72 @@ class VideoConversationAgent:
             
             # Conversation loop
             while True:
-                user_input = input(f"\nAsk about the video (or 'next' for a new video):\n> ").strip()
+                user_input = input(
+                    "\nAsk about the video ('next' for a new video, 'clear' to start over):\n> "
+                ).strip()
                 
                 if user_input.lower() == 'next':
                     break
                 
+                if user_input.lower() == 'clear':
+                    # Never clear_memory(None) here: that would forget every video
+                    video_id = self.youtube.extract_video_id(video_url)
+                    if video_id:
+                        self.clear_memory(video_id)
+                        print("Conversation cleared.")
+                    continue
+                
                 if not user_input:
                     print("Please enter a question or message.")
                     continue
                 
                 print("\n" + "-"*40)
-                print("Video Creator: Thinking...\n")
+                sys.stdout.write("Video Creator: ")
+                sys.stdout.flush()
                 
                 try:
-                    response = self.run_conversation(
+                    async for text in self.stream_conversation(
                         video_url,
                         user_input,
                         native_language
-                    )
-                    print(f"Video Creator: {response}\n")
+                    ):
+                        sys.stdout.write(text)
+                        sys.stdout.flush()
+                    print("\n")
                 except Exception as e:
                     print(f"Error: {str(e)}\n")
-                    self.logger.error(f"Conversation error: {str(e)}")
+                    self.logger.error("Conversation error: %s", e)
         
         print("-"*60)
 
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Have a conversation with a YouTube video.")
+    parser.add_argument("--url", help="YouTube video URL (required with --batch)")
+    parser.add_argument("--batch", metavar="QUESTIONS_FILE",
+                        help="Answer every question in the file (one per line) and exit")
+    parser.add_argument("--language", default="English", help="Language to respond in")
+    args = parser.parse_args()
+    if args.batch and not args.url:
+        parser.error("--batch requires --url")
+    
     # Load environment variables
-    load_dotenv()
+    if load_dotenv is not None:
+        load_dotenv()
     
     try:
         agent = VideoConversationAgent()
-        agent.interactive_mode()
+        if args.batch:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                queries = [line.strip() for line in f if line.strip()]
+            responses = asyncio.run(
+                agent.run_conversation_batch(args.url, queries, args.language)
+            )
+            for user_query, response in zip(queries, responses):
+                print(f"\nQ: {user_query}\nVideo Creator: {response}")
+        else:
+            asyncio.run(agent.interactive_mode())
     except ValueError as e:
         print(f"Configuration Error: {e}")
         print("\nPlease set GOOGLE_API_KEY in .env file or environment variable")
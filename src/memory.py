@@ -2,31 +2,552 @@
 Memory Module - Stores and retrieves conversation history and video context.
 """
 
+import atexit
 import json
 import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Protocol, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Background writer: how often written files are fsync'd, and how many
+# passes a failing write is retried for before it's dropped
+FSYNC_INTERVAL = 2.0
+MAX_WRITE_ATTEMPTS = 5
+
+# Queued by close() to stop the writer thread
+_STOP = object()
+
+# Files written by older versions: a full snapshot per save, newest last
+_LEGACY_RE = re.compile(r"(.+)_\d{8}_\d{6}\.json")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class Storage(Protocol):
+    """
+    Where ConversationMemory keeps its files, addressed by file name.
+    """
+
+    def read(self, key: str) -> bytes:
+        """Return a file's contents."""
+
+    def write(self, key: str, data: bytes) -> None:
+        """Replace a file's contents."""
+
+    def append(self, key: str, data: bytes) -> None:
+        """Add data to the end of a file, creating it if needed."""
+
+    def exists(self, key: str) -> bool:
+        """Whether a file exists."""
+
+    def delete(self, key: str) -> None:
+        """Remove a file if it exists."""
+
+    def keys(self, suffix: str) -> List[str]:
+        """Names of the stored files ending in suffix, sorted."""
+
+    def sync(self, key: str) -> None:
+        """Make a file's written data durable."""
+
+    def path(self, key: str) -> str:
+        """Location of a file, as reported to callers."""
+
+
+class FileStorage:
+    """
+    Stores files in a directory on disk.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize file storage, creating the directory if needed.
+        
+        Args:
+            root: Directory to store files in
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def read(self, key: str) -> bytes:
+        with open(self.root / key, 'rb') as f:
+            return f.read()
+
+    def write(self, key: str, data: bytes) -> None:
+        with open(self.root / key, 'wb') as f:
+            f.write(data)
+
+    def append(self, key: str, data: bytes) -> None:
+        with open(self.root / key, 'ab') as f:
+            f.write(data)
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    def delete(self, key: str) -> None:
+        (self.root / key).unlink(missing_ok=True)
+
+    def keys(self, suffix: str) -> List[str]:
+        return sorted(p.name for p in self.root.glob(f"*{suffix}"))
+
+    def sync(self, key: str) -> None:
+        """Flush a file's written data to the disk."""
+        if self.exists(key):
+            with open(self.root / key, 'ab') as f:
+                os.fsync(f.fileno())
+
+    def path(self, key: str) -> str:
+        return str(self.root / key)
+
+
+class DictStorage:
+    """
+    Keeps files in a dictionary, e.g. for tests or throwaway sessions.
+    """
+
+    def __init__(self):
+        """Initialize empty in-memory storage."""
+        self.files: Dict[str, bytes] = {}
+
+    def read(self, key: str) -> bytes:
+        return self.files[key]
+
+    def write(self, key: str, data: bytes) -> None:
+        self.files[key] = data
+
+    def append(self, key: str, data: bytes) -> None:
+        self.files[key] = self.files.get(key, b"") + data
+
+    def exists(self, key: str) -> bool:
+        return key in self.files
+
+    def delete(self, key: str) -> None:
+        self.files.pop(key, None)
+
+    def keys(self, suffix: str) -> List[str]:
+        return sorted(k for k in self.files if k.endswith(suffix))
+
+    def sync(self, key: str) -> None:
+        pass
+
+    def path(self, key: str) -> str:
+        return key
+
 
 class ConversationMemory:
     """
     Manages conversation history and video context for continuity and learning.
     """
 
-    def __init__(self, memory_dir: str = "data/memory"):
+    def __init__(
+        self,
+        memory_dir: str = "data/memory",
+        max_cached: int = 128,
+        index_path: Optional[str] = None,
+        storage: Optional[Storage] = None
+    ):
         """
         Initialize the memory store.
         
         Args:
             memory_dir: Directory to store conversation files
+            max_cached: Maximum number of conversations kept in memory
+            index_path: SQLite index location (defaults to memory.db in
+                memory_dir, or to ":memory:" when a custom storage is given)
+            storage: Where conversation files are kept (defaults to
+                FileStorage(memory_dir))
         """
         self.memory_dir = Path(memory_dir)
-        self.memory_dir.mkdir(parents=True, exist_ok=True)
+        if storage is None:
+            storage = FileStorage(memory_dir)
+            index_path = index_path or str(self.memory_dir / "memory.db")
+        self.storage = storage
+        # video_id -> stored conversation, least recently used first
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_cached = max_cached
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.logger.info(f"Memory store initialized at {memory_dir}")
+        
+        # Sidecar index so listing doesn't have to read every conversation;
+        # shared with the writer thread
+        self._db = sqlite3.connect(
+            index_path or ":memory:",
+            check_same_thread=False
+        )
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS conversations("
+                "video_id TEXT PRIMARY KEY, title TEXT, created_at TEXT, "
+                "message_count INT, path TEXT)"
+            )
+            empty = self._db.execute("SELECT COUNT(*) FROM conversations").fetchone()[0] == 0
+        
+        # Disk writes happen on a background thread; save_conversation only queues them
+        self._write_q: queue.Queue = queue.Queue()
+        # Last write error not yet reported by flush() or close()
+        self._write_error: Optional[Exception] = None
+        # Number of failed writes waiting for a retry
+        self._pending_writes = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self._close_at_exit)
+        
+        self._migrate_legacy()
+        if empty:
+            self._rebuild_index()
+        
+        self.logger.info("Memory store initialized at %s", memory_dir)
+
+    def _index_row(self, stored: Dict[str, Any]) -> tuple:
+        """Build the index row for a stored conversation."""
+        return (
+            stored["video_id"],
+            stored.get("video_metadata", {}).get("title"),
+            stored.get("created_at"),
+            len(stored["conversation"]),
+            self.storage.path(self._conversation_key(stored["video_id"]))
+        )
+
+    def _rebuild_index(self) -> None:
+        """Index conversations already on disk (e.g. saved before the index existed)."""
+        rows = []
+        for key in self.storage.keys(".meta.json"):
+            stored = self._load(key[:-len(".meta.json")])
+            if stored:
+                rows.append(self._index_row(stored))
+        
+        with self._db_lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?)", rows)
+
+    def _migrate_legacy(self) -> None:
+        """
+        Convert conversations saved by older versions, which wrote a full
+        {video_id}_{timestamp}.json snapshot on every save, to the metadata +
+        JSONL layout. The newest snapshot of each video is kept and its old
+        files are deleted once the new ones are written.
+        """
+        legacy: Dict[str, List[str]] = {}
+        for key in self.storage.keys(".json"):
+            match = _LEGACY_RE.fullmatch(key)
+            if match:
+                legacy.setdefault(match.group(1), []).append(key)
+        
+        rows = []
+        for video_id, keys in legacy.items():
+            if self.storage.exists(self._metadata_key(video_id)):
+                # Already has a conversation in the new layout; leave both alone
+                continue
+            try:
+                # Timestamps sort chronologically, so the last key is the newest
+                stored = _loads(self.storage.read(keys[-1]))
+                stored["video_id"] = video_id
+                conversation = stored.pop("conversation", [])
+                
+                conversation_key = self._conversation_key(video_id)
+                self.storage.write(
+                    conversation_key,
+                    b"".join(_dumps(msg) + b"\n" for msg in conversation)
+                )
+                self.storage.sync(conversation_key)
+                self.storage.write(self._metadata_key(video_id), _dumps(stored))
+                self.storage.sync(self._metadata_key(video_id))
+                for key in keys:
+                    self.storage.delete(key)
+                
+                stored["conversation"] = conversation
+                rows.append(self._index_row(stored))
+            except Exception as e:
+                self.logger.error("Error migrating conversation %s: %s", video_id, e)
+        
+        if rows:
+            with self._db_lock, self._db:
+                self._db.executemany("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?)", rows)
+            self.logger.info("Migrated %s conversations to the JSONL layout", len(rows))
+
+    def _writer_loop(self) -> None:
+        """
+        Background thread: write queued messages, coalescing whatever has queued
+        up, and fsync at most every FSYNC_INTERVAL seconds (or when flushed).
+        Writes that fail are kept and retried on the next pass, and dropped
+        (leaving their error for flush() to raise) after MAX_WRITE_ATTEMPTS.
+        """
+        dirty: Set[str] = set()
+        pending: List[Tuple[str, bytes, Optional[Dict[str, Any]], tuple]] = []
+        attempts = 0
+        last_sync = time.monotonic()
+        
+        while True:
+            try:
+                batch = [self._write_q.get(timeout=FSYNC_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+            
+            writes = pending + [item for item in batch if isinstance(item, tuple)]
+            sync_requested = len(writes) - len(pending) < len(batch)
+            stop = any(item is _STOP for item in batch)
+            try:
+                if writes:
+                    written, failed = self._write_batch(writes)
+                    dirty.update(written)
+                    if pending and not failed:
+                        # The retried writes went through after all
+                        self._write_error = None
+                    attempts = attempts + 1 if failed else 0
+                    if attempts >= MAX_WRITE_ATTEMPTS:
+                        self.logger.error(
+                            "Dropping %s conversation writes after %s attempts", len(failed), attempts
+                        )
+                        failed, attempts = [], 0
+                    pending = failed
+                    self._pending_writes = len(pending)
+                if dirty and (sync_requested or time.monotonic() - last_sync >= FSYNC_INTERVAL):
+                    for key in list(dirty):
+                        self.storage.sync(key)
+                        dirty.discard(key)
+                    last_sync = time.monotonic()
+            except Exception as e:
+                self.logger.error("Error syncing conversation memory: %s", e)
+                self._write_error = e
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+            
+            if stop:
+                return
+
+    def _write_batch(
+        self,
+        writes: List[Tuple[str, bytes, Optional[Dict[str, Any]], tuple]]
+    ) -> Tuple[Set[str], List[Tuple[str, bytes, Optional[Dict[str, Any]], tuple]]]:
+        """
+        Write a batch of queued saves, one append per video.
+        
+        Each video's metadata and index row are written before its messages are
+        appended, so retrying a video whose write failed never duplicates lines.
+        
+        Args:
+            writes: Queued (video_id, JSONL lines, metadata or None, index row) items
+            
+        Returns:
+            Tuple of (keys of the files written, writes that failed)
+        """
+        by_video: Dict[str, List[Tuple[str, bytes, Optional[Dict[str, Any]], tuple]]] = {}
+        for item in writes:
+            by_video.setdefault(item[0], []).append(item)
+        
+        written = set()
+        failed = []
+        for video_id, items in by_video.items():
+            metadata = [item[2] for item in items if item[2] is not None]
+            try:
+                if metadata:
+                    key = self._metadata_key(video_id)
+                    self.storage.write(key, _dumps(metadata[-1]))
+                    written.add(key)
+                with self._db_lock, self._db:
+                    self._db.execute("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?)", items[-1][3])
+                key = self._conversation_key(video_id)
+                self.storage.append(key, b"".join(item[1] for item in items))
+                written.add(key)
+            except Exception as e:
+                self.logger.error("Error writing conversation %s (will retry): %s", video_id, e)
+                self._write_error = e
+                failed.extend(items)
+        
+        return written, failed
+
+    def flush(self) -> None:
+        """
+        Block until every queued save is written and fsync'd.
+        
+        Raises:
+            Exception: The last write error since the previous flush(), if some
+                messages couldn't be written (they stay queued and are retried,
+                up to MAX_WRITE_ATTEMPTS times)
+        """
+        self._drain()
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def _drain(self) -> None:
+        """Block until the writer has made a pass over everything queued."""
+        if not self._closed:
+            self._write_q.put(None)
+            self._write_q.join()
+
+    def close(self) -> None:
+        """
+        Write everything queued, then stop the writer thread and close the index.
+        
+        Raises:
+            Exception: The last write error, if queued messages couldn't be written
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self._close_at_exit)
+        self._write_q.put(_STOP)
+        self._writer.join()
+        with self._db_lock:
+            self._db.close()
+        if self._write_error is not None:
+            raise self._write_error
+
+    def _close_at_exit(self) -> None:
+        """close() at interpreter exit, logging a write error instead of raising it."""
+        try:
+            self.close()
+        except Exception as e:
+            self.logger.error("Conversation memory not fully written at exit: %s", e)
+
+    @staticmethod
+    def _conversation_key(video_id: str) -> str:
+        """File name of the append-only message log for a video."""
+        return f"{video_id}.jsonl"
+
+    @staticmethod
+    def _metadata_key(video_id: str) -> str:
+        """File name of the metadata file for a video."""
+        return f"{video_id}.meta.json"
+
+    def _load(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored conversation for a video, reading it from disk once.
+        
+        Args:
+            video_id: The video identifier
+            
+        Returns:
+            The cached conversation dictionary (not a copy) or None
+        """
+        if video_id in self._cache:
+            self._cache.move_to_end(video_id)
+            return self._cache[video_id]
+        
+        # Queued writes for an evicted conversation must land before re-reading
+        # it, including failed ones that are waiting for a retry
+        self._write_q.join()
+        while self._pending_writes and not self._closed:
+            self._drain()
+        if self._write_error is not None:
+            self.logger.warning("Reading %s after failed writes; it may be missing messages", video_id)
+        
+        metadata_key = self._metadata_key(video_id)
+        if not self.storage.exists(metadata_key):
+            return None
+        
+        data = _loads(self.storage.read(metadata_key))
+        
+        conversation = []
+        conversation_key = self._conversation_key(video_id)
+        if self.storage.exists(conversation_key):
+            lines = self.storage.read(conversation_key).splitlines()
+            conversation = [_loads(line) for line in lines if line.strip()]
+        
+        data["conversation"] = conversation
+        self._cache_put(video_id, data)
+        return data
+
+    def _cache_put(self, video_id: str, data: Dict[str, Any]) -> None:
+        """Cache a conversation, evicting the least recently used beyond max_cached."""
+        self._cache[video_id] = data
+        self._cache.move_to_end(video_id)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def _stored_for(
+        self,
+        video_id: str,
+        video_metadata: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Get the stored conversation for a video, creating it if needed.
+        
+        Args:
+            video_id: The video identifier
+            video_metadata: Metadata about the video
+            
+        Returns:
+            Tuple of (cached conversation, metadata to write or None if unchanged)
+        """
+        stored = self._load(video_id)
+        if stored is None:
+            stored = {
+                "video_id": video_id,
+                "video_metadata": video_metadata,
+                "created_at": datetime.now().isoformat(),
+                "conversation": []
+            }
+            self._cache_put(video_id, stored)
+        elif stored["video_metadata"] != video_metadata:
+            stored["video_metadata"] = video_metadata
+        else:
+            return stored, None
+        return stored, {k: v for k, v in stored.items() if k != "conversation"}
+
+    def _queue_messages(
+        self,
+        video_id: str,
+        stored: Dict[str, Any],
+        new_messages: List[Dict[str, str]],
+        metadata: Optional[Dict[str, Any]]
+    ) -> str:
+        """
+        Add messages to the cached conversation and queue them for appending.
+        
+        Args:
+            video_id: The video identifier
+            stored: Cached conversation from _stored_for()
+            new_messages: Messages not yet stored
+            metadata: Metadata to write, or None
+            
+        Returns:
+            Path to the conversation file
+        """
+        if self._closed:
+            raise RuntimeError("ConversationMemory is closed")
+        filepath = self.storage.path(self._conversation_key(video_id))
+        lines = []
+        for msg in new_messages:
+            record = {**msg, "timestamp": msg.get("timestamp") or datetime.now().isoformat()}
+            lines.append(_dumps(record) + b"\n")
+            stored["conversation"].append(record)
+        
+        self._write_q.put((video_id, b"".join(lines), metadata, self._index_row(stored)))
+        self.logger.info("Queued %s messages for %s", len(new_messages), filepath)
+        return filepath
 
     def save_conversation(
         self,
@@ -37,37 +558,75 @@ class ConversationMemory:
         """
         Save a conversation session to disk.
         
+        Messages beyond those already stored for the video are appended to its
+        JSONL log; earlier messages are never rewritten. The in-memory copy is
+        updated immediately and the disk write is queued for the background
+        writer (use flush() to wait for it).
+        
         Args:
             video_id: Unique identifier for the video
-            conversation: List of user/assistant message pairs
+            conversation: List of user/assistant message pairs, starting with
+                the messages already stored for the video
             video_metadata: Metadata about the video
             
         Returns:
-            Path to saved conversation file
+            Path to the conversation file
+            
+        Raises:
+            ValueError: If conversation doesn't start with the stored messages
+                (e.g. a shorter or fresh list), which appending can't represent
+        """
+        try:
+            existing = self._load(video_id)
+            known = existing["conversation"] if existing else []
+            if len(conversation) < len(known) or any(
+                (msg.get("user"), msg.get("assistant")) != (old.get("user"), old.get("assistant"))
+                for msg, old in zip(conversation, known)
+            ):
+                raise ValueError(
+                    f"Conversation for {video_id} doesn't extend the {len(known)} stored messages; "
+                    "use clear_memory() first to replace it"
+                )
+            stored, metadata = self._stored_for(video_id, video_metadata)
+            new_messages = conversation[len(known):]
+            return self._queue_messages(video_id, stored, new_messages, metadata)
+        except Exception as e:
+            self.logger.error("Error saving conversation: %s", e)
+            raise
+
+    def append_message(
+        self,
+        video_id: str,
+        message: Dict[str, str],
+        video_metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        timestamp = datetime.now().isoformat()
-        filename = f"{video_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        filepath = self.memory_dir / filename
+        Append a single message to a video's conversation.
         
-        memory_data = {
-            "video_id": video_id,
-            "video_metadata": video_metadata,
-            "created_at": timestamp,
-            "conversation": conversation
-        }
+        Like save_conversation(), but without passing the whole conversation:
+        exactly one line is appended to the JSONL log.
         
+        Args:
+            video_id: Unique identifier for the video
+            message: User/assistant message pair
+            video_metadata: Metadata about the video (keeps the stored metadata if None)
+            
+        Returns:
+            Path to the conversation file
+        """
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(memory_data, f, indent=2, ensure_ascii=False)
-            self.logger.info(f"Conversation saved to {filepath}")
-            return str(filepath)
+            if video_metadata is None:
+                existing = self._load(video_id)
+                video_metadata = existing["video_metadata"] if existing else {}
+            stored, metadata = self._stored_for(video_id, video_metadata)
+            return self._queue_messages(video_id, stored, [message], metadata)
         except Exception as e:
-            self.logger.error(f"Error saving conversation: {str(e)}")
+            self.logger.error("Error appending message: %s", e)
             raise
 
     def load_conversation(self, video_id: str) -> Optional[Dict[str, Any]]:
         """
-        Load the most recent conversation for a video.
+        Load the stored conversation for a video.
         
         Args:
             video_id: The video identifier
@@ -76,17 +635,16 @@ class ConversationMemory:
             Dictionary with conversation history or None
         """
         try:
-            files = sorted(self.memory_dir.glob(f"{video_id}_*.json"), reverse=True)
-            if not files:
-                self.logger.info(f"No conversation found for video {video_id}")
+            data = self._load(video_id)
+            if data is None:
+                self.logger.info("No conversation found for video %s", video_id)
                 return None
             
-            with open(files[0], 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self.logger.info(f"Loaded conversation from {files[0]}")
-            return data
+            self.logger.info("Loaded conversation for %s", video_id)
+            # Callers append to the returned list; keep the cache's own copy intact
+            return {**data, "conversation": list(data["conversation"])}
         except Exception as e:
-            self.logger.error(f"Error loading conversation: {str(e)}")
+            self.logger.error("Error loading conversation: %s", e)
             return None
 
     def add_message(
@@ -111,7 +669,7 @@ class ConversationMemory:
             "user": user_message,
             "assistant": assistant_response
         }
-        self.logger.info(f"Message added to memory for {video_id}")
+        self.logger.info("Message added to memory for %s", video_id)
         return message
 
     def get_conversation_context(self, video_id: str, limit: int = 5) -> str:
@@ -149,20 +707,56 @@ class ConversationMemory:
             Number of files deleted
         """
         try:
+            self._drain()
             if video_id:
-                files = list(self.memory_dir.glob(f"{video_id}_*.json"))
+                files = [
+                    key for key in (self._conversation_key(video_id), self._metadata_key(video_id))
+                    if self.storage.exists(key)
+                ]
+                self._cache.pop(video_id, None)
+                with self._db_lock, self._db:
+                    self._db.execute("DELETE FROM conversations WHERE video_id = ?", (video_id,))
             else:
-                files = list(self.memory_dir.glob("*.json"))
+                files = self.storage.keys(".jsonl") + self.storage.keys(".meta.json")
+                self._cache.clear()
+                with self._db_lock, self._db:
+                    self._db.execute("DELETE FROM conversations")
             
-            for f in files:
-                f.unlink()
+            for key in files:
+                self.storage.delete(key)
             
-            self.logger.info(f"Cleared {len(files)} memory files")
+            self.logger.info("Cleared %s memory files", len(files))
             return len(files)
         except Exception as e:
-            self.logger.error(f"Error clearing memory: {str(e)}")
+            self.logger.error("Error clearing memory: %s", e)
             return 0
 
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """
+        List stored sessions from their metadata files alone.
+        
+        Reads one small .meta.json per session and never the .jsonl message
+        logs, so the cost doesn't grow with conversation length.
+        
+        Returns:
+            List of session metadata
+        """
+        sessions = []
+        try:
+            self._drain()
+            for key in self.storage.keys(".meta.json"):
+                data = _loads(self.storage.read(key))
+                sessions.append({
+                    "video_id": data["video_id"],
+                    "video_title": data.get("video_metadata", {}).get("title"),
+                    "created_at": data.get("created_at")
+                })
+            self.logger.info("Listed %s sessions", len(sessions))
+        except Exception as e:
+            self.logger.error("Error listing sessions: %s", e)
+        
+        return sessions
+
     def list_conversations(self) -> List[Dict[str, Any]]:
         """
         List all stored conversations.
@@ -172,17 +766,21 @@ class ConversationMemory:
         """
         conversations = []
         try:
-            for filepath in sorted(self.memory_dir.glob("*.json"), reverse=True):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            self._drain()
+            with self._db_lock:
+                rows = self._db.execute(
+                    "SELECT video_id, title, created_at, message_count "
+                    "FROM conversations ORDER BY created_at DESC"
+                ).fetchall()
+            for video_id, title, created_at, message_count in rows:
                 conversations.append({
-                    "video_id": data.get("video_id"),
-                    "video_title": data.get("video_metadata", {}).get("title"),
-                    "created_at": data.get("created_at"),
-                    "message_count": len(data.get("conversation", []))
+                    "video_id": video_id,
+                    "video_title": title,
+                    "created_at": created_at,
+                    "message_count": message_count
                 })
-            self.logger.info(f"Listed {len(conversations)} conversations")
+            self.logger.info("Listed %s conversations", len(conversations))
         except Exception as e:
-            self.logger.error(f"Error listing conversations: {str(e)}")
+            self.logger.error("Error listing conversations: %s", e)
         
         return conversations
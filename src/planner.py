@@ -4,7 +4,7 @@ Planner Module - Breaks down user goals into sub-tasks using ReAct pattern.
 
 import json
 import logging
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,16 @@ class TaskPlanner:
     Breaks down a user query into actionable sub-tasks using ReAct (Reasoning + Acting) pattern.
     """
 
-    def __init__(self):
+    def __init__(self, client: Optional[Any] = None, model_name: str = "gemini-1.5-pro"):
+        """
+        Initialize the planner.
+        
+        Args:
+            client: Optional google-genai Client, only needed for precise_token_count()
+            model_name: Gemini model whose tokenizer precise_token_count() uses
+        """
+        self.client = client
+        self.model_name = model_name
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def plan_video_conversation(self, user_query: str, video_url: str) -> Dict[str, Any]:
@@ -28,7 +37,7 @@ class TaskPlanner:
         Returns:
             Dictionary containing planned sub-tasks
         """
-        self.logger.info(f"Planning conversation for video: {video_url}")
+        self.logger.info("Planning conversation for video: %s", video_url)
         
         plan = {
             "main_goal": f"Have a conversation about the YouTube video in the user's native language",
@@ -73,10 +82,10 @@ class TaskPlanner:
             }
         }
         
-        self.logger.info(f"Plan created with {len(plan['sub_tasks'])} sub-tasks")
+        self.logger.info("Plan created with %s sub-tasks", len(plan['sub_tasks']))
         return plan
 
-    def identify_required_tools(self, plan: Dict[str, Any]) -> List[str]:
+    def identify_required_tools(self, plan: Dict[str, Any]) -> Set[str]:
         """
         Identify which tools are needed for the plan.
         
@@ -84,27 +93,56 @@ class TaskPlanner:
             plan: The plan dictionary from plan_video_conversation()
             
         Returns:
-            List of required tool names
+            Set of required tool names
         """
-        tools = set()
-        for task in plan.get("sub_tasks", []):
-            if "tool_required" in task:
-                tools.add(task["tool_required"])
+        tools = {
+            task["tool_required"]
+            for task in plan.get("sub_tasks", [])
+            if "tool_required" in task
+        }
         
-        self.logger.info(f"Required tools: {tools}")
-        return list(tools)
+        self.logger.info("Required tools: %s", tools)
+        return tools
 
-    def estimate_tokens(self, video_transcript: str) -> int:
+    def estimate_tokens(
+        self,
+        video_transcript: str,
+        model_limit: int = 1_048_576
+    ) -> Tuple[int, bool]:
         """
         Estimate the number of tokens in the transcript.
         
         Args:
             video_transcript: The full video transcript text
+            model_limit: Context window of the target model, in tokens
             
         Returns:
-            Estimated token count
+            Tuple of (estimated token count, whether the estimate is close enough
+            to model_limit that precise_token_count() should be consulted)
         """
         # Rough estimation: 1 token ≈ 4 characters
         estimated_tokens = len(video_transcript) // 4
-        self.logger.info(f"Estimated tokens: {estimated_tokens}")
-        return estimated_tokens
+        needs_precise = estimated_tokens > 0.9 * model_limit
+        self.logger.info("Estimated tokens: %s", estimated_tokens)
+        return estimated_tokens, needs_precise
+
+    async def precise_token_count(self, text: str) -> int:
+        """
+        Count tokens with Gemini's tokenizer. This is a full API round-trip, so
+        only call it when estimate_tokens() says the heuristic isn't enough.
+        
+        Args:
+            text: Text to count
+            
+        Returns:
+            Exact token count
+        """
+        if self.client is None:
+            raise ValueError("precise_token_count requires a Gemini client")
+        
+        response = await self.client.aio.models.count_tokens(
+            model=self.model_name,
+            contents=text
+        )
+        self.logger.info("Counted tokens: %s", response.total_tokens)
+        return response.total_tokens
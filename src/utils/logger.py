@@ -2,9 +2,26 @@
 Logging utilities for the agent.
 """
 
+import atexit
 import logging
+import queue
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+    
+    QueueHandler.prepare() formats each record in the calling thread so it
+    can be pickled; these records never leave the process, so they're queued
+    as they are. Log arguments are therefore formatted later and shouldn't be
+    mutated after the logging call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 def setup_logging(log_dir: str = "logs", log_level=logging.INFO) -> None:
     """
@@ -38,6 +55,11 @@ def setup_logging(log_dir: str = "logs", log_level=logging.INFO) -> None:
     file_handler.setLevel(log_level)
     file_handler.setFormatter(console_format)
     
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Formatting and console/file I/O happen on a listener thread; logging
+    # calls only enqueue
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    logger.addHandler(_DeferredQueueHandler(log_queue))
@@ -0,0 +1,289 @@
+"""
+Semantic cache - Reuses answers to previously asked (or paraphrased) questions about a video.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words that point back at earlier turns ("Why did he do that?", "Tell me more")
+FOLLOW_UP_WORDS = frozenset({
+    "it", "its", "he", "him", "his", "she", "her", "they", "them", "their",
+    "that", "those", "these", "more", "else", "again", "also", "too",
+    "above", "earlier", "previous", "before", "same", "instead"
+})
+
+# Shorter questions ("Why?", "How so?") are assumed to be follow-ups
+MIN_STANDALONE_WORDS = 4
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+class CacheHit(NamedTuple):
+    """A cached answer whose question matched the incoming query."""
+    query: str
+    response: str
+    score: float
+
+
+class EmbeddingModel:
+    """
+    Produces normalized sentence embeddings with a local sentence-transformers model.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        """
+        Initialize the embedding model. The model itself is loaded on first use.
+
+        Args:
+            model_name: sentence-transformers model name
+        """
+        self.model_name = model_name
+        self._model = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a piece of text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Unit-length float32 embedding vector
+        """
+        return self._get_model().encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several pieces of text in one batched call.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Unit-length float32 embeddings, one row per text
+        """
+        return self._get_model().encode(texts, normalize_embeddings=True).astype(np.float32)
+
+    def _get_model(self):
+        """Load the sentence-transformers model on first use."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+            self.logger.info("Loaded embedding model %s", self.model_name)
+        return self._model
+
+
+class CosineSimilarity:
+    """
+    Scores a query embedding against stored embeddings.
+    """
+
+    @staticmethod
+    def scores(query_embedding: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Compute cosine similarity between one query and many stored embeddings.
+
+        Args:
+            query_embedding: Unit-length vector of shape (dim,)
+            embeddings: Unit-length vectors of shape (n, dim)
+
+        Returns:
+            Similarity scores of shape (n,)
+        """
+        # Both sides are normalized, so the dot product is the cosine
+        return embeddings @ query_embedding
+
+
+class SemanticCache:
+    """
+    Per-video cache of question embeddings and the answers given to them.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/memory/semcache",
+        embedder: Optional[EmbeddingModel] = None,
+        similarity: Optional[CosineSimilarity] = None
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            cache_dir: Directory to persist per-video cache files
+            embedder: Embedding model (defaults to all-MiniLM-L6-v2)
+            similarity: Similarity calculator (defaults to cosine)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder or EmbeddingModel()
+        self.similarity = similarity or CosineSimilarity()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.info("Semantic cache initialized at %s", cache_dir)
+
+    @staticmethod
+    def is_standalone(query: str) -> bool:
+        """
+        Whether a question can be answered without the conversation so far.
+
+        Only standalone questions are looked up or cached: the answer to a
+        follow-up like "Why?" depends on what came before it.
+
+        Args:
+            query: The user's question
+
+        Returns:
+            True if the question has enough words and none that refer back
+        """
+        words = _WORD_RE.findall(query.lower())
+        return len(words) >= MIN_STANDALONE_WORDS and FOLLOW_UP_WORDS.isdisjoint(words)
+
+    def embed(self, query: str) -> np.ndarray:
+        """
+        Embed a user query for lookup/insert.
+
+        Args:
+            query: The user's question
+
+        Returns:
+            Query embedding
+        """
+        return self.embedder.embed(query)
+
+    def embed_many(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several user queries at once (faster than embed() per query).
+
+        Args:
+            queries: The user's questions
+
+        Returns:
+            Query embeddings, one row per query
+        """
+        return self.embedder.embed_many(queries)
+
+    def lookup(
+        self,
+        video_id: str,
+        query_embedding: np.ndarray,
+        language: str = "English",
+        threshold: float = 0.92
+    ) -> Optional[CacheHit]:
+        """
+        Find a cached answer to a similar question about the same video.
+
+        Args:
+            video_id: The video identifier
+            query_embedding: Embedding from embed()
+            language: Language the answer must be in
+            threshold: Minimum cosine similarity to count as a hit
+
+        Returns:
+            The best matching CacheHit, or None
+        """
+        entries = self._get_entries(video_id)
+        if not entries["queries"]:
+            return None
+
+        scores = self.similarity.scores(query_embedding, entries["embeddings"])
+        languages = np.array(entries["languages"])
+        scores = np.where(languages == language, scores, -1.0)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+
+        return CacheHit(
+            query=entries["queries"][best],
+            response=entries["responses"][best],
+            score=float(scores[best])
+        )
+
+    def insert(
+        self,
+        video_id: str,
+        query: str,
+        query_embedding: np.ndarray,
+        response: str,
+        language: str = "English"
+    ) -> None:
+        """
+        Store an answer for future lookups.
+
+        Args:
+            video_id: The video identifier
+            query: The user's question
+            query_embedding: Embedding from embed()
+            response: The answer that was given
+            language: Language of the answer
+        """
+        entries = self._get_entries(video_id)
+        row = query_embedding[np.newaxis, :]
+        entries["embeddings"] = np.vstack([entries["embeddings"], row]) if entries["queries"] else row
+        entries["queries"].append(query)
+        entries["responses"].append(response)
+        entries["languages"].append(language)
+
+        np.savez(
+            self.cache_dir / f"{video_id}.npz",
+            embeddings=entries["embeddings"],
+            queries=np.array(entries["queries"]),
+            responses=np.array(entries["responses"]),
+            languages=np.array(entries["languages"])
+        )
+        self.logger.info("Cached response for %s (%s entries)", video_id, len(entries['queries']))
+
+    def clear(self, video_id: Optional[str] = None) -> None:
+        """
+        Forget cached answers for a video, or for all videos.
+
+        Args:
+            video_id: Optional video ID. If None, clears the whole cache.
+        """
+        if video_id:
+            self._entries.pop(video_id, None)
+            (self.cache_dir / f"{video_id}.npz").unlink(missing_ok=True)
+        else:
+            self._entries.clear()
+            for filepath in self.cache_dir.glob("*.npz"):
+                filepath.unlink()
+        self.logger.info("Cleared semantic cache for %s", video_id or "all videos")
+
+    def _get_entries(self, video_id: str) -> Dict[str, Any]:
+        """
+        Get the in-memory entries for a video, loading them from disk once.
+
+        Args:
+            video_id: The video identifier
+
+        Returns:
+            Dictionary with embeddings, queries, responses and languages
+        """
+        if video_id in self._entries:
+            return self._entries[video_id]
+
+        filepath = self.cache_dir / f"{video_id}.npz"
+        if filepath.exists():
+            with np.load(filepath) as data:
+                entries = {
+                    "embeddings": data["embeddings"],
+                    "queries": data["queries"].tolist(),
+                    "responses": data["responses"].tolist(),
+                    "languages": data["languages"].tolist()
+                }
+        else:
+            entries = {
+                "embeddings": np.empty((0, 0), dtype=np.float32),
+                "queries": [],
+                "responses": [],
+                "languages": []
+            }
+
+        self._entries[video_id] = entries
+        return entries
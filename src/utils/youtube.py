@@ -2,12 +2,85 @@
 YouTube utilities - Handles video fetching and transcript extraction.
 """
 
+import asyncio
 import logging
+from functools import lru_cache
 from typing import Dict, Optional, Any
 import re
 
 logger = logging.getLogger(__name__)
 
+# watch, short-link, embed and /v/ URLs, capturing the 11-character video ID
+_YT_RE = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/|youtube\.com/v/)([A-Za-z0-9_-]{11})'
+)
+
+
+@lru_cache(maxsize=128)
+def _fetch_metadata(video_id: str) -> Dict[str, Any]:
+    """
+    Fetch metadata for a video. Cached per video ID, since it doesn't change
+    between turns; callers must not mutate the returned dict.
+    
+    Args:
+        video_id: The 11-character video ID
+        
+    Returns:
+        Dictionary with title, channel, duration, upload date and views
+    """
+    logger.info("Fetching metadata for video %s", video_id)
+    
+    # In production, you would use:
+    # from pytube import YouTube
+    # yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+    # But for demo purposes, we return a template
+    
+    return {
+        "title": "Video Title (Requires API)",
+        "channel": "Channel Name (Requires API)",
+        "duration": "Duration (Requires API)",
+        "upload_date": "Upload Date (Requires API)",
+        "views": "View Count (Requires API)"
+    }
+
+
+@lru_cache(maxsize=128)
+def _fetch_transcript(video_id: str) -> str:
+    """
+    Fetch the transcript for a video. Cached per video ID.
+    
+    Args:
+        video_id: The 11-character video ID
+        
+    Returns:
+        Video transcript text
+    """
+    logger.info("Fetching transcript for video %s", video_id)
+    
+    # In production, use:
+    # from youtube_transcript_api import YouTubeTranscriptApi
+    # transcript = YouTubeTranscriptApi.get_transcript(video_id)
+    
+    return f"""
+[TRANSCRIPT - To be fetched using youtube-transcript-api]
+
+This is a template transcript for video ID: {video_id}
+
+In production, this would contain the actual video transcript with timing information.
+The transcript would be fetched using the YouTube Transcript API.
+
+Key features:
+- Full speech-to-text conversion
+- Timestamps for each segment
+- Speaker identification (if available)
+- Support for multiple languages
+
+This transcript will be used by:
+1. The planner to identify key topics
+2. The executor to generate contextual responses
+3. The memory module to maintain conversation history
+"""
+
 
 class YouTubeHandler:
     """
@@ -15,12 +88,16 @@ class YouTubeHandler:
     Note: This is a simplified version. For production, use youtube-transcript-api and pytube.
     """
 
+    # Compiled once at import and shared by every handler
+    _YT_RE = _YT_RE
+
     def __init__(self):
         """Initialize YouTube handler."""
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.info("YouTubeHandler initialized")
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def extract_video_id(url: str) -> Optional[str]:
         """
         Extract video ID from YouTube URL.
@@ -31,17 +108,8 @@ class YouTubeHandler:
         Returns:
             Video ID or None
         """
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        match = YouTubeHandler._YT_RE.search(url)
+        return match.group(1) if match else None
 
     def get_video_metadata(self, video_url: str) -> Dict[str, Any]:
         """
@@ -53,29 +121,14 @@ class YouTubeHandler:
         Returns:
             Dictionary with video metadata
         """
-        self.logger.info(f"Fetching metadata for: {video_url}")
-        
         video_id = self.extract_video_id(video_url)
         if not video_id:
             self.logger.error("Invalid YouTube URL")
             return {"error": "Invalid YouTube URL"}
         
-        # In production, you would use:
-        # from pytube import YouTube
-        # yt = YouTube(video_url)
-        # But for demo purposes, we return a template
-        
-        metadata = {
-            "video_id": video_id,
-            "url": video_url,
-            "title": "Video Title (Requires API)",
-            "channel": "Channel Name (Requires API)",
-            "duration": "Duration (Requires API)",
-            "upload_date": "Upload Date (Requires API)",
-            "views": "View Count (Requires API)"
-        }
+        metadata = {"video_id": video_id, "url": video_url, **_fetch_metadata(video_id)}
         
-        self.logger.info(f"Metadata retrieved for video {video_id}")
+        self.logger.info("Metadata retrieved for video %s", video_id)
         return metadata
 
     def get_video_transcript(self, video_url: str) -> str:
@@ -88,38 +141,38 @@ class YouTubeHandler:
         Returns:
             Video transcript text
         """
-        self.logger.info(f"Fetching transcript for: {video_url}")
-        
         video_id = self.extract_video_id(video_url)
         if not video_id:
             return "Error: Invalid YouTube URL"
         
-        # In production, use:
-        # from youtube_transcript_api import YouTubeTranscriptApi
-        # transcript = YouTubeTranscriptApi.get_transcript(video_id)
+        transcript = _fetch_transcript(video_id)
         
-        transcript = f"""
-[TRANSCRIPT - To be fetched using youtube-transcript-api]
-
-This is a template transcript for video ID: {video_id}
-
-In production, this would contain the actual video transcript with timing information.
-The transcript would be fetched using the YouTube Transcript API.
+        self.logger.info("Transcript retrieved successfully")
+        return transcript
 
-Key features:
-- Full speech-to-text conversion
-- Timestamps for each segment
-- Speaker identification (if available)
-- Support for multiple languages
+    async def get_video_metadata_async(self, video_url: str) -> Dict[str, Any]:
+        """
+        Get video metadata without blocking the event loop.
+        
+        Args:
+            video_url: The YouTube video URL
+            
+        Returns:
+            Dictionary with video metadata
+        """
+        return await asyncio.to_thread(self.get_video_metadata, video_url)
 
-This transcript will be used by:
-1. The planner to identify key topics
-2. The executor to generate contextual responses
-3. The memory module to maintain conversation history
-"""
+    async def get_video_transcript_async(self, video_url: str) -> str:
+        """
+        Get video transcript without blocking the event loop.
         
-        self.logger.info("Transcript retrieved successfully")
-        return transcript
+        Args:
+            video_url: The YouTube video URL
+            
+        Returns:
+            Video transcript text
+        """
+        return await asyncio.to_thread(self.get_video_transcript, video_url)
 
     def validate_url(self, url: str) -> bool:
         """
@@ -132,7 +185,7 @@ This transcript will be used by:
             True if valid YouTube URL, False otherwise
         """
         if self.extract_video_id(url):
-            self.logger.info(f"Valid YouTube URL: {url}")
+            self.logger.info("Valid YouTube URL: %s", url)
             return True
-        self.logger.warning(f"Invalid YouTube URL: {url}")
+        self.logger.warning("Invalid YouTube URL: %s", url)
         return False
@@ -1,91 +1,313 @@
 """
-Test script for Video Conversation Agent
+Tests for Video Conversation Agent (run with pytest)
 Validates that all components work correctly
 """
 
-import sys
+# Only stdlib at module level; project modules (and their SDK dependencies)
+# are imported inside the tests that use them
 import logging
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent))
-
-from src.planner import TaskPlanner
-from src.executor import AgentExecutor
-from src.memory import ConversationMemory
-from src.utils.youtube import YouTubeHandler
-from src.utils.logger import setup_logging
+import asyncio
+import functools
+import importlib
 import os
-from dotenv import load_dotenv
+import json
+import queue
+import re
+import sqlite3
+import threading
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+import pytest
+
+log = logging.getLogger(__name__)
 
 
-def test_imports():
-    """Test that all modules import correctly."""
-    print("✓ Testing imports...")
-    assert TaskPlanner is not None
-    assert AgentExecutor is not None
-    assert ConversationMemory is not None
-    assert YouTubeHandler is not None
-    print("  ✅ All imports successful")
+@functools.lru_cache(maxsize=1)
+def _env():
+    """GOOGLE_API_KEY, with .env parsed once per session."""
+    importlib.import_module("dotenv").load_dotenv()
+    return os.environ.get("GOOGLE_API_KEY")
 
 
 def test_logger():
     """Test logging setup."""
-    print("\n✓ Testing logger setup...")
-    setup_logging()
+    log.debug("Testing logger setup...")
+    importlib.import_module("src.utils.logger").setup_logging()
     logger = logging.getLogger("TestLogger")
     logger.info("Test log message")
-    print("  ✅ Logging works")
+    log.debug("Logging works")
 
 
-def test_youtube_handler():
-    """Test YouTube URL validation."""
-    print("\n✓ Testing YouTube handler...")
-    yt = YouTubeHandler()
-    
-    # Test valid URL
-    valid_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
-    assert yt.validate_url(valid_url), "Should validate YouTube URL"
+def test_log_formatting_is_deferred():
+    """Test that log records are queued unformatted, for the listener thread to format."""
+    handler = importlib.import_module("src.utils.logger")._DeferredQueueHandler(queue.Queue())
+    record = logging.makeLogRecord({"msg": "Loaded %s messages", "args": (3,)})
     
-    video_id = yt.extract_video_id(valid_url)
-    assert video_id == "dQw4w9WgXcQ", "Should extract correct video ID"
+    with patch.object(handler, "format") as format_record:
+        handler.emit(record)
     
-    # Test invalid URL
-    invalid_url = "https://not-a-youtube-url.com"
-    assert not yt.validate_url(invalid_url), "Should reject non-YouTube URL"
-    
-    print("  ✅ YouTube handler works")
+    format_record.assert_not_called()
+    queued = handler.queue.get_nowait()
+    assert queued.args == (3,) and queued.getMessage() == "Loaded 3 messages", "Should queue the raw record"
+
 
+@pytest.mark.parametrize("url,valid,video_id", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", True, "dQw4w9WgXcQ"),
+    ("https://not-a-youtube-url.com", False, None),
+])
+def test_youtube_handler(yt_handler, url, valid, video_id):
+    """Test YouTube URL validation."""
+    assert isinstance(type(yt_handler)._YT_RE, re.Pattern), "URL regex should be precompiled"
+    assert yt_handler.validate_url(url) is valid, "Should accept only YouTube URLs"
+    if valid:
+        assert yt_handler.extract_video_id(url) == video_id, "Should extract correct video ID"
 
-def test_memory():
+
+def test_memory(memory):
     """Test memory operations."""
-    print("\n✓ Testing memory operations...")
-    memory = ConversationMemory("test_memory")
+    log.debug("Testing memory operations...")
     
-    # Test saving conversation
+    # The memory fixture keeps its files in a DictStorage, so nothing touches
+    # the disk and nothing needs cleaning up
     video_id = "test_video_123"
     conversation = [
         {"user": "What is this video about?", "assistant": "This video is about..."}
     ]
-    metadata = {"title": "Test Video", "channel": "Test Channel"}
+    metadata = {"title": "Test Video – ビデオ", "channel": "Test Channel"}
     
+    # Test saving conversation
     filepath = memory.save_conversation(video_id, conversation, metadata)
-    assert Path(filepath).exists(), "Conversation file should exist"
+    memory.flush()
+    assert isinstance(filepath, str) and filepath.endswith(".jsonl"), "Should return the JSONL path"
+    
+    # Check what was written against the stored files
+    files = memory.storage.files
+    records = [json.loads(line) for line in files[f"{video_id}.jsonl"].splitlines()]
+    assert [r["user"] for r in records] == ["What is this video about?"], "Message should be written"
+    stored_metadata = json.loads(files[f"{video_id}.meta.json"])
+    assert stored_metadata["video_id"] == video_id, "Metadata should be written"
     
     # Test loading conversation
     loaded = memory.load_conversation(video_id)
     assert loaded is not None, "Should load conversation"
     assert loaded["video_id"] == video_id, "Video ID should match"
     
-    # Cleanup
-    memory.clear_memory(video_id)
-    print("  ✅ Memory operations work")
+    # Test the serialized round trip: a fresh store decodes the same data
+    fresh = type(memory)(storage=memory.storage)
+    reloaded = fresh.load_conversation(video_id)
+    fresh.close()
+    assert reloaded == loaded, "Stored conversation should round-trip unchanged"
+    
+    log.debug("Memory operations work")
+
+
+def test_memory_append(memory):
+    """Test that appending a message writes exactly one JSONL line."""
+    video_id = "test_video_append"
+    metadata = {"title": "Test Video", "channel": "Test Channel"}
+    
+    memory.save_conversation(video_id, [{"user": "First", "assistant": "Reply"}], metadata)
+    memory.flush()
+    before = memory.storage.files[f"{video_id}.jsonl"]
+    
+    memory.append_message(video_id, {"user": "Second", "assistant": "Reply"})
+    memory.flush()
+    
+    after = memory.storage.files[f"{video_id}.jsonl"]
+    assert after.startswith(before), "Should not rewrite earlier messages"
+    appended = after[len(before):]
+    assert appended.count(b"\n") == 1, "Should append exactly one line"
+    assert json.loads(appended)["user"] == "Second", "Should append the new message"
+    assert len(memory.load_conversation(video_id)["conversation"]) == 2, "Should keep both messages"
+
+
+def test_memory_rejects_diverging_history(memory):
+    """Test that saving a list that doesn't extend the stored history fails loudly."""
+    video_id = "test_video_diverge"
+    metadata = {"title": "Test Video"}
+    conversation = [{"user": "First", "assistant": "Reply"}, {"user": "Second", "assistant": "Reply"}]
+    memory.save_conversation(video_id, conversation, metadata)
+    
+    with pytest.raises(ValueError):
+        memory.save_conversation(video_id, [{"user": "Fresh start", "assistant": "Reply"}], metadata)
+    with pytest.raises(ValueError):
+        memory.save_conversation(video_id, [{"user": "Other", "assistant": "Reply"}] * 3, metadata)
+    
+    memory.flush()
+    stored = memory.load_conversation(video_id)["conversation"]
+    assert [m["user"] for m in stored] == ["First", "Second"], "Stored history should be untouched"
+
+
+def test_memory_migrates_legacy_files():
+    """Test that per-save JSON snapshots from older versions are converted on startup."""
+    memory_module = importlib.import_module("src.memory")
+    storage = memory_module.DictStorage()
+    
+    def snapshot(turns):
+        return json.dumps({
+            "video_id": "legacy_vid",
+            "video_metadata": {"title": "Old Video"},
+            "created_at": "2024-01-01T12:00:00",
+            "conversation": [{"user": f"Question {i}", "assistant": "Answer", "timestamp": None}
+                             for i in range(turns)]
+        }, indent=2).encode("utf-8")
+    
+    storage.write("legacy_vid_20240101_120000.json", snapshot(1))
+    storage.write("legacy_vid_20240102_090000.json", snapshot(2))
+    
+    memory = memory_module.ConversationMemory(storage=storage)
+    loaded = memory.load_conversation("legacy_vid")
+    listed = memory.list_conversations()
+    memory.close()
+    
+    assert [m["user"] for m in loaded["conversation"]] == ["Question 0", "Question 1"], \
+        "Should keep the newest snapshot"
+    assert loaded["video_metadata"] == {"title": "Old Video"}, "Should keep the metadata"
+    assert sorted(storage.files) == ["legacy_vid.jsonl", "legacy_vid.meta.json"], \
+        "Should replace the snapshots with the new layout"
+    assert [(c["video_id"], c["message_count"]) for c in listed] == [("legacy_vid", 2)], "Should index it"
+
+
+def test_memory_close():
+    """Test that closing memory writes what's queued and releases its thread."""
+    memory_module = importlib.import_module("src.memory")
+    threads = threading.active_count()
+    memory = memory_module.ConversationMemory(storage=memory_module.DictStorage())
+    memory.save_conversation("vid", [{"user": "Question", "assistant": "Answer"}], {"title": "T"})
+    
+    memory.close()
+    
+    assert threading.active_count() == threads, "Should stop the writer thread"
+    assert b"Question" in memory.storage.files["vid.jsonl"], "Should write queued messages first"
+    with pytest.raises(RuntimeError):
+        memory.append_message("vid", {"user": "Late", "assistant": "Answer"})
+
+
+def test_memory_retries_failed_writes():
+    """Test that a failed write is kept and retried instead of dropped."""
+    memory_module = importlib.import_module("src.memory")
+    
+    class FlakyStorage(memory_module.DictStorage):
+        failures = 1
+        
+        def append(self, key, data):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            super().append(key, data)
+    
+    memory = memory_module.ConversationMemory(storage=FlakyStorage())
+    memory.save_conversation("vid", [{"user": "Question", "assistant": "Answer"}], {"title": "T"})
+    with pytest.raises(OSError):
+        memory.flush()
+    
+    memory.flush()
+    memory.close()
+    lines = memory.storage.files["vid.jsonl"].splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["user"] == "Question", "Should write the message exactly once"
+
+
+def test_memory_load_waits_for_retries():
+    """Test that re-reading an evicted conversation waits for its failed write to be retried."""
+    memory_module = importlib.import_module("src.memory")
+    
+    class FlakyStorage(memory_module.DictStorage):
+        failures = 1
+        
+        def append(self, key, data):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            super().append(key, data)
+    
+    memory = memory_module.ConversationMemory(storage=FlakyStorage())
+    memory.save_conversation("vid", [{"user": "Question", "assistant": "Answer"}], {"title": "T"})
+    memory._write_q.join()
+    memory._cache.clear()
+    
+    loaded = memory.load_conversation("vid")
+    memory.close()
+    assert [m["user"] for m in loaded["conversation"]] == ["Question"], "Should read the retried write"
 
 
-def test_planner():
+def test_memory_gives_up_on_failing_writes(monkeypatch, caplog):
+    """Test that writes to broken storage are dropped after MAX_WRITE_ATTEMPTS, with the error reported."""
+    memory_module = importlib.import_module("src.memory")
+    monkeypatch.setattr(memory_module, "MAX_WRITE_ATTEMPTS", 3)
+    
+    class BrokenStorage(memory_module.DictStorage):
+        def append(self, key, data):
+            raise OSError("disk full")
+    
+    memory = memory_module.ConversationMemory(storage=BrokenStorage())
+    memory.save_conversation("vid", [{"user": "Question", "assistant": "Answer"}], {"title": "T"})
+    for _ in range(3):
+        with pytest.raises(OSError):
+            memory.flush()
+    memory.flush()
+    assert memory._pending_writes == 0, "Should stop retrying"
+    
+    memory.append_message("vid", {"user": "Late", "assistant": "Answer"})
+    with caplog.at_level(logging.ERROR):
+        memory._close_at_exit()
+    assert "not fully written at exit" in caplog.text, "Should log, not raise, at interpreter exit"
+
+
+def test_memory_list_sessions(disk_memory):
+    """Test that listing sessions reads only the metadata files."""
+    memory = disk_memory
+    for video_id in ("video_a", "video_b"):
+        memory.save_conversation(
+            video_id,
+            [{"user": "Question", "assistant": "Answer"}] * 3,
+            {"title": f"Title {video_id}"}
+        )
+    memory.flush()
+    
+    with patch("src.memory.open", side_effect=open) as counting_open:
+        sessions = memory.list_sessions()
+    
+    assert {"video_a", "video_b"} <= {s["video_id"] for s in sessions}, "Should list both sessions"
+    opened = [str(c.args[0]) for c in counting_open.call_args_list]
+    assert len(opened) == len(sessions), "Should open one file per session"
+    assert all(path.endswith(".meta.json") for path in opened), "Should never read message logs"
+
+
+def test_memory_index(disk_memory, memory_dir):
+    """Test that the SQLite index lists conversations and is rebuilt from disk."""
+    memory = disk_memory
+    for video_id, turns in (("index_old", 2), ("index_new", 4)):
+        memory.save_conversation(
+            video_id,
+            [{"user": "Question", "assistant": "Answer"}] * turns,
+            {"title": f"Title {video_id}"}
+        )
+    memory.flush()
+    
+    def indexed(conversations):
+        return [(c["video_id"], c["message_count"]) for c in conversations
+                if c["video_id"].startswith("index_")]
+    
+    listed = memory.list_conversations()
+    assert indexed(listed) == [("index_new", 4), ("index_old", 2)], "Should list newest first with message counts"
+    dates = [c["created_at"] for c in listed]
+    assert dates == sorted(dates, reverse=True), "Should order by created_at descending"
+    
+    memory.close()
+    with sqlite3.connect(memory_dir / "memory.db") as db:
+        db.execute("DELETE FROM conversations")
+    
+    reopened = importlib.import_module("src.memory").ConversationMemory(str(memory_dir))
+    try:
+        assert indexed(reopened.list_conversations()) == [("index_new", 4), ("index_old", 2)], \
+            "Should rebuild the index from the files on disk"
+    finally:
+        reopened.close()
+
+
+def test_planner(planner):
     """Test task planner."""
-    print("\n✓ Testing task planner...")
-    planner = TaskPlanner()
+    log.debug("Testing task planner...")
     
     plan = planner.plan_video_conversation(
         "What is this video about?",
@@ -96,55 +318,336 @@ def test_planner():
     assert len(plan["sub_tasks"]) == 5, "Should have 5 sub-tasks"
     
     tools = planner.identify_required_tools(plan)
-    assert len(tools) > 0, "Should identify required tools"
+    assert frozenset(tools) == frozenset({"youtube_api", "gemini_api", "memory_store"}), \
+        "Should identify each required tool once"
     
-    print("  ✅ Planner works")
+    log.debug("Planner works")
 
 
-def test_api_key():
-    """Test API key configuration."""
-    print("\n✓ Testing API key configuration...")
-    load_dotenv()
+def test_planner_token_count():
+    """Test token counting with a stubbed Gemini client (no network)."""
+    TaskPlanner = importlib.import_module("src.planner").TaskPlanner
+    client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+        count_tokens=AsyncMock(return_value=SimpleNamespace(total_tokens=42))
+    )))
+    planner = TaskPlanner(client)
+    
+    assert asyncio.run(planner.precise_token_count("transcript")) == 42, "Should return Gemini's count"
+    client.aio.models.count_tokens.assert_awaited_once()
     
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if api_key and api_key != "your_google_gemini_api_key_here":
-        print("  ✅ API key configured")
-        return True
-    else:
-        print("  ⚠️  API key not configured")
-        print("     Please set GOOGLE_API_KEY in .env file")
-        return False
+    tokens, needs_precise = planner.estimate_tokens("x" * 400, model_limit=100)
+    assert tokens == 100 and needs_precise, "Should flag estimates near the limit"
 
 
-def main():
-    """Run all tests."""
-    print("=" * 50)
-    print("Video Conversation Agent - Test Suite")
-    print("=" * 50)
+def test_history_prompt(executor):
+    """Test that history prompts carry only the last few exchanges."""
+    conversation = [{"user": f"Question {i}", "assistant": f"Answer {i}"} for i in range(7)]
     
-    try:
-        test_imports()
-        test_logger()
-        test_youtube_handler()
-        test_memory()
-        test_planner()
-        api_configured = test_api_key()
-        
-        print("\n" + "=" * 50)
-        print("✅ All tests passed!")
-        print("=" * 50)
-        
-        if api_configured:
-            print("\n🚀 Ready to run: python src/main.py")
-        else:
-            print("\n⚠️  Configure API key before running the agent")
-        
-    except Exception as e:
-        print(f"\n❌ Test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+    prompt = executor._history_prompt("Next?", conversation, "English")
+    assert "User: Question 6\nVideo (Assistant): Answer 6" in prompt, "Should render each exchange"
+    assert "Question 1\n" not in prompt and "Question 2\n" in prompt, "Should keep the last 5 exchanges"
+
+
+def test_fit_to_context_counts_near_budget(executor):
+    """Test that transcripts close to the budget get an exact token count."""
+    executor.max_transcript_chars = 4000  # 1000 tokens
+    executor.planner.precise_token_count = AsyncMock(side_effect=[1200, 950])
+    
+    short = executor.invoke(executor._fit_to_context("x" * 2000))
+    assert short == "x" * 2000 and not executor.planner.precise_token_count.called, \
+        "Should trust the estimate well below the budget"
+    
+    fitted = executor.invoke(executor._fit_to_context("x" * 3800))
+    assert executor.planner.precise_token_count.await_count == 2, "Should count until it fits"
+    assert "[truncated]" in fitted and len(fitted) < 3800, "Should trim by the counted overshoot"
+
 
+def test_invoke_reuses_event_loop(executor):
+    """Test that repeated invoke() calls run on one event loop."""
+    async def running_loop():
+        return asyncio.get_running_loop()
+    
+    first = executor.invoke(running_loop())
+    second = executor.invoke(running_loop())
+    assert first is second and not first.is_closed(), "Should keep the client's event loop alive"
+
+
+class _StubChat:
+    """Chat session without get_history(), like AsyncChat in google-genai 1.2.0."""
+    
+    def __init__(self, history):
+        self.history = list(history)
+        self.sent = []
+    
+    async def send_message(self, message, config=None):
+        if message.startswith("Fail"):
+            raise ValueError("send failed")
+        self.sent.append(message)
+        return SimpleNamespace(text=f"Reply {len(self.sent)}")
+
+
+def test_continue_conversation_reuses_chat(executor):
+    """Test that follow-up turns for a video share one chat session."""
+    chats = []
+    
+    def create(model, history):
+        chats.append(_StubChat(history))
+        return chats[-1]
+    
+    executor.client = SimpleNamespace(aio=SimpleNamespace(chats=SimpleNamespace(create=create)))
+    history = [{"user": "What is this video about?", "assistant": "Cooking."}]
+    
+    for turn in (1, 2):
+        result = executor.invoke(executor.continue_conversation(
+            "Tell me more", history, "Transcript", video_metadata={"title": "Test Video"}, video_id="vid"
+        ))
+        assert result["status"] == "success", result.get("error")
+        assert result["response"] == f"Reply {turn}", "Should answer through the chat session"
+    
+    assert len(chats) == 1, "Should create the session once"
+    assert len(chats[0].history) == 2, "Should seed the session with stored history"
+
+
+def test_chat_session_holds_history_turns(executor):
+    """Test that sessions never replay more than HISTORY_TURNS exchanges."""
+    HISTORY_TURNS = importlib.import_module("src.executor").HISTORY_TURNS
+    chats = []
+    
+    def create(model, history):
+        chats.append(_StubChat(history))
+        return chats[-1]
+    
+    executor.client = SimpleNamespace(aio=SimpleNamespace(chats=SimpleNamespace(create=create)))
+    history = [{"user": f"Question {i}", "assistant": f"Answer {i}"} for i in range(HISTORY_TURNS - 2)]
+    
+    def send(query):
+        result = executor.invoke(executor.continue_conversation(
+            query, history, "Transcript", video_metadata={"title": "Test Video"}, video_id="vid"
+        ))
+        if result["status"] == "success":
+            history.append({"user": query, "assistant": result["response"]})
+        return result
+    
+    assert send("Fail")["status"] == "error"
+    assert executor.chats["vid"][1] == HISTORY_TURNS - 2, "Failed sends shouldn't count as turns"
+    
+    send("First")
+    send("Second")
+    assert len(chats) == 1 and executor.chats["vid"][1] == HISTORY_TURNS, "Should reuse the session until full"
+    
+    send("Third")
+    assert len(chats) == 2, "Should rebuild the session once it holds HISTORY_TURNS exchanges"
+    assert len(chats[1].history) == 2 * HISTORY_TURNS, "Should reseed with the last HISTORY_TURNS exchanges"
+
+
+def test_stream_retries_until_first_chunk(executor, monkeypatch):
+    """Test that a stream which fails to open with a retryable error is retried."""
+    errors = importlib.import_module("google.genai.errors")
+    AgentExecutor = importlib.import_module("src.executor").AgentExecutor
+    monkeypatch.setattr(AgentExecutor._start_stream.retry, "wait", importlib.import_module("tenacity").wait_none())
+    attempts = []
+    
+    async def chunks():
+        for text in ("Hello", " there"):
+            yield SimpleNamespace(text=text)
+    
+    async def generate_content_stream(model, contents, config=None):
+        attempts.append(contents)
+        if len(attempts) == 1:
+            raise errors.APIError(503, {"error": {"message": "Unavailable", "status": "UNAVAILABLE"}})
+        return chunks()
+    
+    executor.client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+        generate_content_stream=generate_content_stream
+    )))
+    
+    async def collect():
+        stream = executor.stream_conversational_response("Hi", "Transcript", {"title": "Test Video"})
+        return [text async for text in stream]
+    
+    assert executor.invoke(collect()) == ["Hello", " there"], "Should recover from the failed open"
+    assert len(attempts) == 2, "Should retry the request once"
+
+
+class _StubEmbedder:
+    """Embeds known texts as fixed unit vectors, anything else as a shared default."""
+    
+    VECTORS = {
+        "What is this video about?": [1.0, 0.0, 0.0],
+        "What's the video about?": [0.96, 0.28, 0.0],
+        "Who is the host?": [0.0, 1.0, 0.0],
+    }
+    
+    def embed(self, text):
+        np = importlib.import_module("numpy")
+        return np.array(self.VECTORS.get(text, [0.0, 0.0, 1.0]), dtype=np.float32)
+
+
+def test_semantic_cache(tmp_path):
+    """Test semantic cache threshold, language filter and reload from disk."""
+    SemanticCache = importlib.import_module("src.utils.semcache").SemanticCache
+    cache = SemanticCache(str(tmp_path), embedder=_StubEmbedder())
+    question, paraphrase = "What is this video about?", "What's the video about?"
+    cache.insert("vid", question, cache.embed(question), "Cooking.", "English")
+    
+    hit = cache.lookup("vid", cache.embed(paraphrase), "English")
+    assert hit is not None and hit.response == "Cooking.", "Should match a paraphrase"
+    assert hit.query == question and hit.score == pytest.approx(0.96), "Should report the match"
+    assert cache.lookup("vid", cache.embed(paraphrase), "English", threshold=0.99) is None, \
+        "Should respect the threshold"
+    assert cache.lookup("vid", cache.embed("Who is the host?"), "English") is None, \
+        "Should not match a different question"
+    assert cache.lookup("vid", cache.embed(question), "Spanish") is None, \
+        "Should only return answers in the requested language"
+    assert cache.lookup("other", cache.embed(question), "English") is None, \
+        "Should keep videos separate"
+    
+    reloaded = SemanticCache(str(tmp_path), embedder=_StubEmbedder())
+    hit = reloaded.lookup("vid", cache.embed(paraphrase), "English")
+    assert hit is not None and hit.response == "Cooking.", "Should reload entries from the .npz file"
+    
+    reloaded.clear("vid")
+    assert reloaded.lookup("vid", cache.embed(question), "English") is None, "Should forget cleared videos"
+    assert not (tmp_path / "vid.npz").exists(), "Should delete the cleared video's file"
+
+
+@pytest.mark.parametrize("query,standalone", [
+    ("What is this video about?", True),
+    ("Which tools does the host recommend?", True),
+    ("Why?", False),
+    ("Can you explain that in detail?", False),
+    ("Tell me more about the recipe", False),
+])
+def test_semantic_cache_standalone(query, standalone):
+    """Test which questions are treated as answerable without history."""
+    SemanticCache = importlib.import_module("src.utils.semcache").SemanticCache
+    assert SemanticCache.is_standalone(query) is standalone
+
+
+class _StubExecutor:
+    """Answers every question with a numbered reply."""
+    
+    def __init__(self):
+        self.calls = []
+        self.dropped = []
+    
+    async def generate_conversational_response(self, user_query, *args, **kwargs):
+        self.calls.append(user_query)
+        return {"status": "success", "response": f"Answer {len(self.calls)}"}
+    
+    continue_conversation = generate_conversational_response
+    
+    def drop_chat(self, video_id=None):
+        self.dropped.append(video_id)
+
+
+def test_follow_ups_skip_semantic_cache(agent, tmp_path):
+    """Test that only standalone questions are answered from the semantic cache."""
+    SemanticCache = importlib.import_module("src.utils.semcache").SemanticCache
+    agent.executor = _StubExecutor()
+    # Every unknown text embeds the same way, so any lookup would be a hit
+    agent.semcache = SemanticCache(str(tmp_path / "semcache"), embedder=_StubEmbedder())
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    
+    replies = [asyncio.run(agent.run_conversation(url, query)) for query in ("Why?", "Why?", "How?")]
+    
+    assert replies == ["Answer 1", "Answer 2", "Answer 3"], "Follow-ups should not reuse cached answers"
+    assert len(agent.executor.calls) == 3, "Every follow-up should reach Gemini"
+
+
+def test_standalone_follow_ups_use_semantic_cache(agent, tmp_path):
+    """Test that standalone questions hit the cache mid-conversation, until it's cleared."""
+    SemanticCache = importlib.import_module("src.utils.semcache").SemanticCache
+    agent.executor = _StubExecutor()
+    agent.semcache = SemanticCache(str(tmp_path / "semcache"), embedder=_StubEmbedder())
+    url, video_id = "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"
+    
+    def ask(query):
+        return asyncio.run(agent.run_conversation(url, query))
+    
+    assert ask("What is this video about?") == "Answer 1"
+    assert ask("Why?") == "Answer 2"
+    assert ask("What's the video about?") == "Answer 1", "Should reuse the answer despite the history"
+    assert agent.executor.dropped == [video_id], "Should restart the chat session after a cached answer"
+    assert len(agent.memory.load_conversation(video_id)["conversation"]) == 3, "Should remember cached answers"
+    
+    agent.clear_memory(video_id)
+    assert ask("What's the video about?") == "Answer 3", "Should not serve answers for a cleared video"
+
+
+class _StubSemanticCache:
+    """Semantic cache that never hits."""
+    
+    def __init__(self):
+        self.embedded = []
+    
+    def embed_many(self, queries):
+        self.embedded.append((list(queries), threading.current_thread()))
+        return list(queries)
+    
+    def lookup(self, *args, **kwargs):
+        return None
+    
+    def insert(self, *args, **kwargs):
+        pass
+
+
+class _SlowExecutor:
+    """Answers after a per-question delay, failing questions that start with "Fail"."""
+    
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def generate_conversational_response(self, user_query, *args, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later questions finish first, so ordering comes from the batch, not completion
+        await asyncio.sleep(0.05 / int(user_query.split()[-1]))
+        self.in_flight -= 1
+        if user_query.startswith("Fail"):
+            return {"status": "error", "error": "boom"}
+        return {"status": "success", "response": f"Answer to {user_query}"}
+
+
+def test_run_conversation_batch(agent):
+    """Test batch ordering, failure handling and the concurrency limit."""
+    agent.executor = _SlowExecutor()
+    agent.semcache = _StubSemanticCache()
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    queries = ["Question 1", "Fail 2", "Question 3", "Question 4", "Question 5"]
+    
+    responses = asyncio.run(agent.run_conversation_batch(url, queries, max_concurrency=2))
+    
+    assert responses == [
+        "Answer to Question 1",
+        "Error: Could not generate a response",
+        "Answer to Question 3",
+        "Answer to Question 4",
+        "Answer to Question 5",
+    ], "Responses should follow the order of the queries"
+    assert agent.executor.max_in_flight == 2, "Should respect max_concurrency"
+    [(embedded, thread)] = agent.semcache.embedded
+    assert embedded == queries, "Should embed every question in one call"
+    assert thread is not threading.main_thread(), "Should embed off the event loop"
+    saved = agent.memory.load_conversation("dQw4w9WgXcQ")["conversation"]
+    assert [m["user"] for m in saved] == ["Question 1", "Question 3", "Question 4", "Question 5"], \
+        "Failed answers should not be saved"
+
+
+def test_run_conversation_batch_empty(agent):
+    """Test that an empty batch doesn't create a conversation."""
+    responses = asyncio.run(agent.run_conversation_batch("https://youtu.be/dQw4w9WgXcQ", []))
+    
+    assert responses == [], "Should return no responses"
+    assert agent.memory.load_conversation("dQw4w9WgXcQ") is None, "Should not save anything"
+
+
+def test_api_key():
+    """Test API key configuration."""
+    log.debug("Testing API key configuration...")
+    api_key = _env()
+    if not api_key or api_key == "your_google_gemini_api_key_here":
+        pytest.skip("API key not configured (set GOOGLE_API_KEY in .env file)")
+    log.debug("API key configured")
 
-if __name__ == "__main__":
-    main()